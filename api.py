@@ -3,78 +3,246 @@ Diamond Price Prediction - Flask REST API
 Backend API untuk prediksi harga diamond menggunakan ML model.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g
 from flask_cors import CORS
-import pandas as pd
 import numpy as np
+import hashlib
 import joblib
+import math
 import os
+import time
+import uuid
+
+from intervals import parse_quantiles, format_quantiles
+from bundle import ModelBundle, file_sha256, load_bundle
+from predictor import Predictor
+from artifact import ArtifactError, is_lfs_pointer, load_artifact
+from currency import load_rate_table, round_price
+from audit import create_audit_log
+from drift import DriftMonitor, SQLiteSketchStore, load_baseline
+from ratelimit import ConcurrencyGate, create_limiter, retry_after_header
+from shadow import ShadowEvaluator
+from comparables import load_index
+from jobs import DEFAULT_CHUNK_SIZE, JobQueue
+from validation import error_summary, validator
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS untuk Streamlit
+# Batas ukuran body request (termasuk upload CSV ke POST /jobs)
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 512)) * 1024 * 1024
+# Enable CORS untuk Streamlit (batasi origin via CORS_ORIGINS, pisah koma)
+CORS(app, origins=os.environ.get('CORS_ORIGINS', '*').split(','))
 
 # Load model dan encoder
 model = None
 encoder = None
 features = None
+model_version = None
+primary = None
+predictor = None
+
+# Artefak model tunggal dengan manifest (lihat artifact.py)
+MODEL_ARTIFACT = os.environ.get('MODEL_ARTIFACT', 'model.bundle')
+MODEL_CACHE_DIR = os.environ.get('MODEL_CACHE_DIR', '.cache')
+# Mode offline: tidak pernah download model dari Hugging Face Hub
+MODEL_OFFLINE = os.environ.get('MODEL_OFFLINE', os.environ.get('HF_HUB_OFFLINE', '0')) == '1'
+# Gagal (bukan warning) jika versi sklearn artefak beda dengan runtime
+MODEL_STRICT_VERSION = os.environ.get('MODEL_STRICT_VERSION', '0') == '1'
+
+def load_model_files():
+    """Load model.pkl, encoder.pkl, features.pkl (format lama tiga file)"""
+    model_path = 'model.pkl'
+    encoder_path = 'encoder.pkl'
+    features_path = 'features.pkl'
+    
+    # LFS pointer files start with "version https://git-lfs"
+    if os.path.exists(model_path) and is_lfs_pointer(model_path):
+        if MODEL_OFFLINE:
+            raise ArtifactError("model.pkl is a Git LFS pointer and MODEL_OFFLINE=1 forbids downloading it")
+        print("⚠️ Model file is an LFS pointer, need to fetch actual file...")
+        # Download from HF hub
+        from huggingface_hub import hf_hub_download
+        model_path = hf_hub_download(
+            repo_id="rifaifirdaus/diamond-prediction-api",
+            filename="model.pkl",
+            repo_type="space"
+        )
+        encoder_path = hf_hub_download(
+            repo_id="rifaifirdaus/diamond-prediction-api",
+            filename="encoder.pkl",
+            repo_type="space"
+        )
+        features_path = hf_hub_download(
+            repo_id="rifaifirdaus/diamond-prediction-api",
+            filename="features.pkl",
+            repo_type="space"
+        )
+    
+    return ModelBundle(
+        joblib.load(model_path),
+        joblib.load(encoder_path),
+        joblib.load(features_path),
+        os.environ.get('MODEL_VERSION') or file_sha256(model_path)[:12]
+    )
 
 def load_model():
     """Load ML model, encoder, dan features"""
-    global model, encoder, features
+    global model, encoder, features, model_version, primary, predictor
     try:
-        # Try loading from current directory first
-        model_path = 'model.pkl'
-        encoder_path = 'encoder.pkl'
-        features_path = 'features.pkl'
-        
-        # Check if files exist and are not LFS pointers
-        if os.path.exists(model_path):
-            with open(model_path, 'rb') as f:
-                first_bytes = f.read(20)
-                # LFS pointer files start with "version https://git-lfs"
-                if first_bytes.startswith(b'version https://git'):
-                    print("⚠️ Model file is an LFS pointer, need to fetch actual file...")
-                    # Download from HF hub
-                    from huggingface_hub import hf_hub_download
-                    model_path = hf_hub_download(
-                        repo_id="rifaifirdaus/diamond-prediction-api",
-                        filename="model.pkl",
-                        repo_type="space"
-                    )
-                    encoder_path = hf_hub_download(
-                        repo_id="rifaifirdaus/diamond-prediction-api",
-                        filename="encoder.pkl",
-                        repo_type="space"
-                    )
-                    features_path = hf_hub_download(
-                        repo_id="rifaifirdaus/diamond-prediction-api",
-                        filename="features.pkl",
-                        repo_type="space"
-                    )
+        start = time.perf_counter()
+        if os.path.exists(MODEL_ARTIFACT):
+            bundle = load_artifact(MODEL_ARTIFACT, MODEL_CACHE_DIR, MODEL_STRICT_VERSION,
+                                   version=os.environ.get('MODEL_VERSION'))
+        else:
+            bundle = load_model_files()
         
-        model = joblib.load(model_path)
-        encoder = joblib.load(encoder_path)
-        features = joblib.load(features_path)
-        print("✅ Model loaded successfully!")
+        model, encoder, features = bundle.model, bundle.encoder, bundle.features
+        # Jumlah thread joblib per prediksi (diset oleh serving profile)
+        if os.environ.get('MODEL_N_JOBS'):
+            model.set_params(n_jobs=int(os.environ['MODEL_N_JOBS']))
+        # Versi model untuk audit log
+        model_version = bundle.version
+        primary = bundle
+        predictor = Predictor(bundle)
+        print(f"✅ Model loaded successfully! ({time.perf_counter() - start:.2f} s)")
         return True
+    except ArtifactError as e:
+        print(f"❌ Invalid model artifact: {e}")
+        return False
     except Exception as e:
         print(f"❌ Error loading model: {e}")
         import traceback
         traceback.print_exc()
         return False
 
-# Opsi valid untuk fitur kategorikal
-VALID_CUTS = ['Fair', 'Good', 'Very Good', 'Premium', 'Ideal']
-VALID_COLORS = ['J', 'I', 'H', 'G', 'F', 'E', 'D']
-VALID_CLARITIES = ['I1', 'SI2', 'SI1', 'VS2', 'VS1', 'VVS2', 'VVS1', 'IF']
+# Exchange rate (USD ke mata uang lain), di-refresh di background
+rate_table = load_rate_table()
+
+# Batas jumlah diamond per request batch
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 10000))
+
+# Rate limiting per client (API key atau IP)
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+# Satu token per request /predict, satu token per N baris di batch
+RATE_LIMIT_BATCH_ROWS = int(os.environ.get('RATE_LIMIT_BATCH_ROWS', 100))
+# API key yang dikenal: SHA-256 hex key, pisah koma. Header X-API-Key
+# lain diabaikan (bucket per IP), supaya key acak tidak mendapat bucket baru
+API_KEYS = {h.strip().lower() for h in os.environ.get('API_KEYS', '').split(',') if h.strip()}
+# Percaya X-Forwarded-For (hanya jika API di belakang reverse proxy)
+TRUST_PROXY = os.environ.get('TRUST_PROXY', '0') == '1'
+limiter = create_limiter(
+    backend=os.environ.get('RATE_LIMIT_BACKEND', 'memory'),
+    rate=float(os.environ.get('RATE_LIMIT_RATE', 10)),
+    burst=float(os.environ.get('RATE_LIMIT_BURST', 20)),
+    db_path=os.environ.get('RATE_LIMIT_DB', 'ratelimit.db')
+)
+
+# Batas request prediksi yang diproses bersamaan (0 = tanpa batas)
+MAX_INFLIGHT = int(os.environ.get('MAX_INFLIGHT', 8))
+concurrency_gate = ConcurrencyGate(
+    MAX_INFLIGHT, timeout=float(os.environ.get('INFLIGHT_TIMEOUT', 0.05))
+) if MAX_INFLIGHT > 0 else None
+
+LIMITED_ENDPOINTS = {'predict', 'predict_batch', 'comparables', 'submit_job', 'job_results'}
 
-# Exchange rate
-USD_TO_IDR = 15500
+# Audit log semua quote (ditulis async oleh background thread)
+audit_log = create_audit_log()
 
 # Load model at module level (for gunicorn)
 print("🔄 Loading model at startup...")
 load_model()
 
+# Drift monitor distribusi input vs baseline training. Counter di-flush ke
+# DRIFT_DB (dibagi semua worker di host, per jam, DRIFT_WINDOW jam
+# terakhir), kosong = per proses saja. Ganti versi model = counter baru.
+DRIFT_DB = os.environ.get('DRIFT_DB', 'drift.db')
+DRIFT_WINDOW = int(os.environ.get('DRIFT_WINDOW', 24))
+drift_monitor = DriftMonitor(
+    store=SQLiteSketchStore(DRIFT_DB, window_hours=DRIFT_WINDOW) if DRIFT_DB else None,
+    flush_interval=float(os.environ.get('DRIFT_FLUSH_INTERVAL', 5.0)),
+    version=model_version
+)
+drift_baseline = load_baseline(os.environ.get('DRIFT_BASELINE', 'drift_baseline.json'))
+
+# Model kandidat untuk evaluasi shadow/canary (optional)
+shadow_evaluator = None
+
+def load_shadow():
+    """Load model kandidat dari SHADOW_MODEL_DIR jika diset"""
+    global shadow_evaluator
+    shadow_dir = os.environ.get('SHADOW_MODEL_DIR')
+    if not shadow_dir or primary is None:
+        return False
+    try:
+        candidate = load_bundle(shadow_dir, os.environ.get('SHADOW_MODEL_VERSION'))
+        shadow_evaluator = ShadowEvaluator(
+            candidate,
+            mode=os.environ.get('SHADOW_MODE', 'shadow'),
+            canary_percent=float(os.environ.get('CANARY_PERCENT', 0)),
+            sample_percent=float(os.environ.get('SHADOW_SAMPLE_PERCENT', 10)),
+            max_pending=int(os.environ.get('SHADOW_MAX_PENDING', 32)),
+            threshold_pct=float(os.environ.get('SHADOW_THRESHOLD_PCT', 10)),
+            gate=concurrency_gate
+        )
+        print(f"✅ Candidate model {candidate.version} loaded ({shadow_evaluator.mode} mode)")
+        return True
+    except Exception as e:
+        print(f"❌ Error loading candidate model: {e}")
+        return False
+
+load_shadow()
+
+# Index diamond pembanding dari dataset referensi (optional)
+comparables_index = None
+MAX_COMPARABLES = int(os.environ.get('MAX_COMPARABLES', 50))
+
+def load_comparables():
+    """Load/build index comparables dari REFERENCE_DATA jika diset"""
+    global comparables_index
+    reference_path = os.environ.get('REFERENCE_DATA')
+    if not reference_path:
+        return False
+    try:
+        start = time.perf_counter()
+        comparables_index = load_index(reference_path, os.environ.get('COMPARABLES_CACHE_DIR', '.cache'))
+        print(f"✅ Comparables index ready: {comparables_index.size:,} diamonds "
+              f"({time.perf_counter() - start:.1f} s)")
+        return True
+    except Exception as e:
+        print(f"❌ Error loading comparables index: {e}")
+        return False
+
+load_comparables()
+
+# Antrian job repricing (diproses oleh `python jobs.py worker`, dijalankan
+# otomatis oleh profile gunicorn)
+job_queue = JobQueue()
+JOBS_INPUT_DIR = os.path.abspath(os.environ.get('JOBS_INPUT_DIR', 'jobs_input'))
+# Stream hasil job memegang satu thread selama stream berjalan: batasi
+# jumlah stream bersamaan per proses dan lama ?follow=1
+JOBS_MAX_STREAMS = int(os.environ.get('JOBS_MAX_STREAMS', 1))
+JOBS_FOLLOW_TIMEOUT = float(os.environ.get('JOBS_FOLLOW_TIMEOUT', 300))
+results_gate = ConcurrencyGate(JOBS_MAX_STREAMS) if JOBS_MAX_STREAMS > 0 else None
+
+
+def start_background_services():
+    """
+    Start thread background (refresh kurs, flush drift, audit writer,
+    shadow executor).
+    Thread tidak ikut ter-copy saat fork, jadi dengan gunicorn --preload
+    fungsi ini hanya dipanggil di setiap worker (post_fork hook), bukan di
+    master: thread yang berjalan di master saat fork bisa mewariskan lock
+    yang sedang terkunci ke worker.
+    """
+    rate_table.start()
+    drift_monitor.start()
+    if audit_log is not None:
+        audit_log.start()
+    if shadow_evaluator is not None:
+        shadow_evaluator.start()
+
+if os.environ.get('START_BACKGROUND_ON_IMPORT', '1') == '1':
+    start_background_services()
+
 
 @app.route('/')
 def home():
@@ -85,7 +253,15 @@ def home():
         "endpoints": {
             "GET /": "This welcome message",
             "GET /health": "Health check",
-            "POST /predict": "Predict diamond price"
+            "POST /predict": "Predict diamond price",
+            "POST /predict/batch": "Predict prices for a list of diamonds",
+            "GET /drift": "Input drift scores vs training baseline",
+            "POST /drift/reset": "Reset drift statistics",
+            "GET /shadow": "Shadow/canary model comparison",
+            "POST /comparables": "Nearest comparable diamonds from reference data",
+            "POST /jobs": "Submit bulk repricing job (CSV)",
+            "GET /jobs/<id>": "Job progress",
+            "GET /jobs/<id>/results": "Stream job results (CSV)"
         }
     })
 
@@ -97,8 +273,147 @@ def health():
         "status": "healthy",
         "model_loaded": model is not None,
         "encoder_loaded": encoder is not None,
-        "features_loaded": features is not None
+        "features_loaded": features is not None,
+        "model_version": model_version,
+        "model_sha256": primary.manifest['payload_sha256'] if primary is not None and primary.manifest else None,
+        "currencies": list(rate_table.currencies),
+        "rates_error": rate_table.last_error,
+        "audit": audit_log.stats() if audit_log is not None else None
+    })
+
+
+def client_key():
+    """Identitas client untuk rate limiting: API key terdaftar, atau IP"""
+    api_key = request.headers.get('X-API-Key')
+    if api_key and API_KEYS:
+        # Hash supaya API key tidak tersimpan di state limiter / audit log
+        digest = hashlib.sha256(api_key.encode()).hexdigest()
+        if digest in API_KEYS:
+            return f"key:{digest[:16]}"
+    if TRUST_PROXY and request.headers.get('X-Forwarded-For'):
+        return f"ip:{request.headers['X-Forwarded-For'].split(',')[0].strip()}"
+    return f"ip:{request.remote_addr}"
+
+
+def request_cost():
+    """Jumlah token yang dipakai request ini"""
+    if request.endpoint != 'predict_batch':
+        return 1
+    data = request.get_json(silent=True)
+    rows = data.get('diamonds') if isinstance(data, dict) else None
+    n_rows = len(rows) if isinstance(rows, list) else 0
+    return max(1, math.ceil(n_rows / RATE_LIMIT_BATCH_ROWS))
+
+
+def reject(status, error, retry_after):
+    """Response penolakan dengan header Retry-After"""
+    response = jsonify({
+        "success": False,
+        "error": error
     })
+    response.status_code = status
+    response.headers['Retry-After'] = retry_after_header(retry_after)
+    return response
+
+
+@app.before_request
+def admission_control():
+    """Rate limit per client, lalu batasi request yang berjalan bersamaan"""
+    g.request_start = time.perf_counter()
+    if request.endpoint not in LIMITED_ENDPOINTS:
+        return None
+    
+    if RATE_LIMIT_ENABLED:
+        allowed, retry_after = limiter.check(client_key(), request_cost())
+        if not allowed:
+            return reject(429, "Rate limit exceeded. Please retry later.", retry_after)
+    
+    if concurrency_gate is not None:
+        if not concurrency_gate.acquire():
+            return reject(503, "Server busy. Please retry later.", 1)
+        g.gate_acquired = True
+    return None
+
+
+@app.teardown_request
+def release_gate(exc):
+    """Lepas slot concurrency gate setelah request selesai"""
+    if g.pop('gate_acquired', False):
+        concurrency_gate.release()
+
+
+def parse_currencies(data):
+    """Ambil list mata uang tambahan dari request body (optional)"""
+    currencies = data.get('currencies') or []
+    if not isinstance(currencies, list) or not all(isinstance(c, str) for c in currencies):
+        raise ValueError("currencies must be a list of currency codes")
+    return [c.upper() for c in currencies]
+
+
+def build_predictions(prices, currencies, level=None, quantiles=None, q_prices=None):
+    """Susun object prediction per diamond dari array harga USD"""
+    # Semua konversi kurs dalam satu langkah vectorized
+    converted = rate_table.convert(prices, ['IDR'] + currencies)
+    converted = {code: values.tolist() for code, values in converted.items()}
+    
+    predictions = []
+    for i, price_usd in enumerate(prices.tolist()):
+        prediction = {
+            "price_usd": round(price_usd, 2),
+            "price_idr": round(converted['IDR'][i], 0)
+        }
+        if currencies:
+            prediction["prices"] = {
+                code: round_price(converted[code][i], code) for code in currencies
+            }
+        if quantiles:
+            prediction.update(format_quantiles(level, quantiles, q_prices, i))
+        predictions.append(prediction)
+    return predictions
+
+
+def audit_quotes(diamonds, prices, version):
+    """Catat quote ke audit log (hanya masuk buffer, tanpa I/O)"""
+    if audit_log is None:
+        return
+    latency_ms = round((time.perf_counter() - g.get('request_start', time.perf_counter())) * 1000, 3)
+    base = {
+        "ts": time.time(),
+        "request_id": uuid.uuid4().hex,
+        "endpoint": request.endpoint,
+        "client": client_key(),
+        "model_version": version,
+        "latency_ms": latency_ms
+    }
+    audit_log.record_many([
+        {**base, "input": diamond, "price_usd": round(price, 2)}
+        for diamond, price in zip(diamonds, prices.tolist())
+    ])
+
+
+def predict_prices(diamonds, quantiles=None, batch=None):
+    """
+    Prediksi harga USD untuk list diamond yang sudah divalidasi.
+
+    Args:
+        batch: optional BatchResult hasil validasi diamonds (dipakai
+            langsung oleh predictor, tanpa konversi ulang)
+
+    Returns:
+        (prices, q_prices, version) - q_prices shape (len(quantiles), n)
+        atau None, version adalah versi model yang melayani request
+    """
+    served = shadow_evaluator.choose(predictor) if shadow_evaluator else predictor
+    data = batch if batch is not None else diamonds
+    
+    # Predict (model predicts log price)
+    log_prices, log_q = served.predict_log(data, quantiles)
+    if shadow_evaluator is not None:
+        # Model lain di-score di background, tidak menunggu hasilnya
+        shadow_evaluator.submit(predictor, served, data, log_prices)
+    
+    q_prices = np.exp(log_q) if log_q is not None else None
+    return np.exp(log_prices), q_prices, served.version
 
 
 @app.route('/predict', methods=['POST'])
@@ -112,7 +427,10 @@ def predict():
         "cut": string (Fair|Good|Very Good|Premium|Ideal),
         "color": string (J|I|H|G|F|E|D),
         "clarity": string (I1|SI2|SI1|VS2|VS1|VVS2|VVS1|IF),
-        "table": float (43-95)
+        "table": float (43-95),
+        "interval": float (0-1, optional, misal 0.9),
+        "quantiles": [float] (0-1, optional, misal [0.1, 0.5, 0.9]),
+        "currencies": [string] (optional, misal ["EUR", "SGD"])
     }
     """
     try:
@@ -126,94 +444,104 @@ def predict():
         # Get request data
         data = request.get_json()
         
-        if not data:
+        if not data or not isinstance(data, dict):
             return jsonify({
                 "success": False,
                 "error": "No JSON data provided"
             }), 400
         
-        # Validate required fields
-        required_fields = ['carat', 'cut', 'color', 'clarity', 'table']
-        missing_fields = [f for f in required_fields if f not in data]
-        
-        if missing_fields:
+        # Validasi semua field sekaligus (semua error dilaporkan)
+        diamond, errors = validator.validate(data)
+        if errors:
             return jsonify({
                 "success": False,
-                "error": f"Missing required fields: {', '.join(missing_fields)}"
+                "error": error_summary(errors),
+                "errors": errors
             }), 400
         
-        # Extract and validate values
-        carat = float(data['carat'])
-        cut = data['cut']
-        color = data['color']
-        clarity = data['clarity']
-        table = float(data['table'])
+        level, quantiles = parse_quantiles(data)
+        currencies = parse_currencies(data)
+        prices, q_prices, version = predict_prices([diamond], quantiles,
+                                                   batch=validator.valid_batch([diamond]))
+        prediction = build_predictions(prices, currencies, level, quantiles, q_prices)[0]
+        audit_quotes([diamond], prices, version)
+        drift_monitor.update([diamond])
         
-        # Validate ranges
-        if not (0.2 <= carat <= 5.0):
-            return jsonify({
-                "success": False,
-                "error": "Carat must be between 0.2 and 5.0"
-            }), 400
+        return jsonify({
+            "success": True,
+            "prediction": prediction,
+            "input": diamond
+        })
         
-        if cut not in VALID_CUTS:
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": f"Invalid value: {str(e)}"
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"Prediction error: {str(e)}"
+        }), 500
+
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Predict harga untuk banyak diamond sekaligus
+    
+    Request Body:
+    {
+        "diamonds": [ {carat, cut, color, clarity, table}, ... ],
+        "interval": float (optional),
+        "quantiles": [float] (optional),
+        "currencies": [string] (optional)
+    }
+    """
+    try:
+        if model is None or encoder is None or features is None:
             return jsonify({
                 "success": False,
-                "error": f"Invalid cut. Must be one of: {', '.join(VALID_CUTS)}"
-            }), 400
+                "error": "Model not loaded. Please check server logs."
+            }), 500
+        
+        data = request.get_json()
+        rows = data.get('diamonds') if isinstance(data, dict) else None
         
-        if color not in VALID_COLORS:
+        if not rows or not isinstance(rows, list):
             return jsonify({
                 "success": False,
-                "error": f"Invalid color. Must be one of: {', '.join(VALID_COLORS)}"
+                "error": "Request body must contain a non-empty 'diamonds' list"
             }), 400
         
-        if clarity not in VALID_CLARITIES:
+        if len(rows) > MAX_BATCH_SIZE:
             return jsonify({
                 "success": False,
-                "error": f"Invalid clarity. Must be one of: {', '.join(VALID_CLARITIES)}"
+                "error": f"Batch too large. Maximum is {MAX_BATCH_SIZE} diamonds"
             }), 400
         
-        if not (43.0 <= table <= 95.0):
+        # Validasi vectorized, semua error per baris dilaporkan
+        result = validator.validate_rows(rows)
+        if not result.all_valid:
+            n_invalid = int((~result.valid).sum())
             return jsonify({
                 "success": False,
-                "error": "Table must be between 43 and 95"
+                "error": f"{n_invalid} of {len(rows)} diamonds failed validation",
+                "errors": result.errors()
             }), 400
+        diamonds = result.rows()
         
-        # Encode categorical features
-        categorical_data = [[cut, color, clarity]]
-        encoded = encoder.transform(categorical_data)
-        
-        # Create input dataframe
-        input_data = pd.DataFrame({
-            'carat': [carat],
-            'cut': [encoded[0][0]],
-            'color': [encoded[0][1]],
-            'clarity': [encoded[0][2]],
-            'table': [table]
-        })
-        
-        # Reorder columns to match training features
-        input_data = input_data[features]
-        
-        # Predict (model predicts log price)
-        log_price = model.predict(input_data)[0]
-        price_usd = float(np.exp(log_price))
-        price_idr = price_usd * USD_TO_IDR
+        level, quantiles = parse_quantiles(data)
+        currencies = parse_currencies(data)
+        prices, q_prices, version = predict_prices(diamonds, quantiles, batch=result)
+        predictions = build_predictions(prices, currencies, level, quantiles, q_prices)
+        audit_quotes(diamonds, prices, version)
+        drift_monitor.update(diamonds)
         
         return jsonify({
             "success": True,
-            "prediction": {
-                "price_usd": round(price_usd, 2),
-                "price_idr": round(price_idr, 0)
-            },
-            "input": {
-                "carat": carat,
-                "cut": cut,
-                "color": color,
-                "clarity": clarity,
-                "table": table
-            }
+            "count": len(predictions),
+            "predictions": predictions
         })
         
     except ValueError as e:
@@ -228,6 +556,185 @@ def predict():
         }), 500
 
 
+@app.route('/drift')
+def drift():
+    """
+    Skor drift input (PSI/KS per fitur) terhadap baseline training.
+    Dengan DRIFT_DB, statistik adalah total semua worker selama
+    DRIFT_WINDOW jam terakhir (worker lain tertinggal maksimal
+    DRIFT_FLUSH_INTERVAL detik). Range waktu ada di drift.window.
+    """
+    return jsonify({
+        "success": True,
+        "shared": drift_monitor.store is not None,
+        "drift": drift_monitor.report(drift_baseline)
+    })
+
+
+@app.route('/drift/reset', methods=['POST'])
+def drift_reset():
+    """Mulai statistik drift dari nol (misal setelah perubahan traffic yang disengaja)"""
+    drift_monitor.clear()
+    return jsonify({
+        "success": True,
+        "shared": drift_monitor.store is not None
+    })
+
+
+@app.route('/shadow')
+def shadow():
+    """Statistik perbandingan model kandidat (shadow/canary) vs model utama"""
+    return jsonify({
+        "success": True,
+        "primary_version": model_version,
+        "shadow": shadow_evaluator.summary() if shadow_evaluator is not None else None
+    })
+
+
+@app.route('/comparables', methods=['POST'])
+def comparables():
+    """
+    Cari diamond paling mirip di dataset referensi
+    
+    Request Body:
+    {
+        "carat", "cut", "color", "clarity", "table": seperti /predict,
+        "k": int (optional, default 5),
+        "exact": bool (optional, hanya cut/color/clarity yang sama)
+    }
+    """
+    if comparables_index is None:
+        return jsonify({
+            "success": False,
+            "error": "Comparables not available. Set REFERENCE_DATA on the server."
+        }), 503
+    
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data, dict):
+        return jsonify({
+            "success": False,
+            "error": "No JSON data provided"
+        }), 400
+    
+    diamond, errors = validator.validate(data)
+    if errors:
+        return jsonify({
+            "success": False,
+            "error": error_summary(errors),
+            "errors": errors
+        }), 400
+    
+    k = data.get('k', 5)
+    if type(k) is not int or not 1 <= k <= MAX_COMPARABLES:
+        return jsonify({
+            "success": False,
+            "error": f"k must be an integer between 1 and {MAX_COMPARABLES}"
+        }), 400
+    exact = data.get('exact', False)
+    if type(exact) is not bool:
+        return jsonify({
+            "success": False,
+            "error": "exact must be a boolean (true or false)"
+        }), 400
+    
+    return jsonify({
+        "success": True,
+        "input": diamond,
+        "exact": exact,
+        "comparables": comparables_index.query(diamond, k=k, exact=exact)
+    })
+
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Submit job repricing untuk file CSV (kolom carat, cut, color, clarity, table)
+    
+    Upload multipart field `file`, atau JSON {"path": nama file di JOBS_INPUT_DIR}.
+    Optional: chunk_size (form field / JSON).
+    """
+    data = request.get_json(silent=True) if request.is_json else request.form
+    if not isinstance(data, dict):
+        data = {}
+    try:
+        chunk_size = int(data.get('chunk_size') or DEFAULT_CHUNK_SIZE)
+        upload = request.files.get('file')
+        if upload is not None:
+            os.makedirs(JOBS_INPUT_DIR, exist_ok=True)
+            input_path = os.path.join(JOBS_INPUT_DIR, f"{uuid.uuid4().hex}.csv")
+            upload.save(input_path)
+        else:
+            name = data.get('path')
+            if not isinstance(name, str) or not name:
+                raise ValueError("Provide a CSV upload ('file') or a 'path' in JOBS_INPUT_DIR")
+            input_path = os.path.realpath(os.path.join(JOBS_INPUT_DIR, name))
+            if os.path.dirname(input_path) != os.path.realpath(JOBS_INPUT_DIR) \
+                    or not os.path.isfile(input_path):
+                raise ValueError(f"File not found in JOBS_INPUT_DIR: {name}")
+        job_id = job_queue.submit(input_path, chunk_size)
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    
+    return jsonify({
+        "success": True,
+        "job": job_queue.get(job_id)
+    }), 202
+
+
+@app.route('/jobs/<job_id>', methods=['GET', 'DELETE'])
+def job_status(job_id):
+    """Progress job (GET) atau batalkan job (DELETE)"""
+    if request.method == 'DELETE':
+        job_queue.cancel(job_id)
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "error": "Job not found"
+        }), 404
+    return jsonify({
+        "success": True,
+        "job": job
+    })
+
+
+@app.route('/jobs/<job_id>/results')
+def job_results(job_id):
+    """
+    Stream hasil job sebagai CSV (chunk yang sudah selesai, berurutan).
+    `?follow=1` menunggu chunk berikutnya sampai job selesai, maksimal
+    JOBS_FOLLOW_TIMEOUT detik per request.
+    """
+    if job_queue.get(job_id) is None:
+        return jsonify({
+            "success": False,
+            "error": "Job not found"
+        }), 404
+    if results_gate is not None and not results_gate.acquire():
+        return reject(503, "Too many result streams. Please retry later.", 5)
+    follow = request.args.get('follow', '0') == '1'
+    response = Response(
+        job_queue.stream_results(job_id, follow=follow, max_seconds=JOBS_FOLLOW_TIMEOUT),
+        mimetype='text/csv'
+    )
+    if results_gate is not None:
+        # Slot dilepas saat stream selesai / client putus, bukan di akhir view
+        response.call_on_close(results_gate.release)
+    return response
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    """Body request (upload) melebihi MAX_UPLOAD_MB"""
+    return jsonify({
+        "success": False,
+        "error": f"Request too large. Maximum is {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB"
+    }), 413
+
+
 if __name__ == '__main__':
     # Load model saat startup
     if load_model():
@@ -236,6 +743,12 @@ if __name__ == '__main__':
         print("   GET  /        - Welcome")
         print("   GET  /health  - Health check")
         print("   POST /predict - Predict diamond price")
+        print("   POST /predict/batch - Predict harga banyak diamond")
+        print("   GET  /drift   - Input drift scores")
+        print("   POST /drift/reset - Reset drift statistics")
+        print("   GET  /shadow  - Shadow/canary comparison")
+        print("   POST /comparables - Nearest comparable diamonds")
+        print("   POST /jobs    - Submit bulk repricing job")
         app.run(host='0.0.0.0', port=5000, debug=True)
     else:
         print("❌ Failed to load model. Exiting.")
@@ -5,13 +5,15 @@ model Machine Learning (Random Forest Regressor).
 """
 
 import streamlit as st
-import pandas as pd
-import numpy as np
-import joblib
 import os
 import time
 import requests
 
+from comparables import load_index
+from currency import load_rate_table
+from predictor import Predictor
+from validation import SCHEMA, VALID_CUTS, VALID_COLORS, VALID_CLARITIES, error_summary, validator
+
 # Konfigurasi halaman
 st.set_page_config(
     page_title="Diamond Price Prediction",
@@ -373,21 +375,40 @@ st.markdown("""
 # Set API_URL via environment variable atau gunakan default HF Spaces
 API_URL = os.environ.get('API_URL', 'https://rifaifirdaus-diamond-prediction-api.hf.space')
 
-# Load model dan encoder (fallback jika API tidak tersedia)
+# Load predictor lokal (fallback jika API tidak tersedia)
 @st.cache_resource
 def load_model():
     try:
-        model = joblib.load('model.pkl')
-        encoder = joblib.load('encoder.pkl')
-        features = joblib.load('features.pkl')
-        return model, encoder, features
+        return Predictor.load('.')
     except:
-        return None, None, None
+        return None
+
+# Tabel kurs (refresh di background, dibagi antar session)
+@st.cache_resource
+def load_rates():
+    rates = load_rate_table()
+    rates.start()
+    return rates
+
+# Index diamond pembanding lokal (fallback jika API tidak tersedia)
+@st.cache_resource
+def load_comparables():
+    reference_path = os.environ.get('REFERENCE_DATA')
+    if not reference_path:
+        return None
+    try:
+        return load_index(reference_path, os.environ.get('COMPARABLES_CACHE_DIR', '.cache'))
+    except Exception:
+        return None
 
 # Opsi untuk fitur kategorikal
-CUT_OPTIONS = ['Fair', 'Good', 'Very Good', 'Premium', 'Ideal']
-COLOR_OPTIONS = ['J', 'I', 'H', 'G', 'F', 'E', 'D']
-CLARITY_OPTIONS = ['I1', 'SI2', 'SI1', 'VS2', 'VS1', 'VVS2', 'VVS1', 'IF']
+CUT_OPTIONS = VALID_CUTS
+COLOR_OPTIONS = VALID_COLORS
+CLARITY_OPTIONS = VALID_CLARITIES
+
+# Range input numerik (sama dengan validasi API)
+CARAT_RANGE = (float(SCHEMA['carat']['min']), float(SCHEMA['carat']['max']))
+TABLE_RANGE = (float(SCHEMA['table']['min']), float(SCHEMA['table']['max']))
 
 def predict_price_api(carat, cut, color, clarity, table):
     """Prediksi harga via Flask API"""
@@ -411,46 +432,57 @@ def predict_price_api(carat, cut, color, clarity, table):
     except:
         return None, False
 
-def predict_price_local(model, encoder, features, carat, cut, color, clarity, table):
+def predict_price_local(predictor, carat, cut, color, clarity, table):
     """Prediksi harga menggunakan model lokal (fallback)"""
-    categorical_data = [[cut, color, clarity]]
-    encoded = encoder.transform(categorical_data)
-    
-    input_data = pd.DataFrame({
-        'carat': [carat],
-        'cut': [encoded[0][0]],
-        'color': [encoded[0][1]],
-        'clarity': [encoded[0][2]],
-        'table': [table]
-    })
-    
-    input_data = input_data[features]
-    log_price = model.predict(input_data)[0]
-    price = np.exp(log_price)
-    return price
+    return float(predictor.predict({
+        "carat": carat, "cut": cut, "color": color, "clarity": clarity, "table": table
+    })[0])
 
-def predict_price(model, encoder, features, carat, cut, color, clarity, table):
+def predict_price(predictor, carat, cut, color, clarity, table):
     """Prediksi harga - coba API dulu, fallback ke lokal"""
+    # Validasi dengan schema yang sama dengan API
+    _, errors = validator.validate({
+        "carat": carat, "cut": cut, "color": color, "clarity": clarity, "table": table
+    })
+    if errors:
+        raise ValueError(error_summary(errors))
+    
     # Coba prediksi via API
     price, success = predict_price_api(carat, cut, color, clarity, table)
     if success:
         return price
     
     # Fallback ke prediksi lokal
-    if model is not None:
-        return predict_price_local(model, encoder, features, carat, cut, color, clarity, table)
+    if predictor is not None:
+        return predict_price_local(predictor, carat, cut, color, clarity, table)
     
     # Jika keduanya gagal
     raise Exception("Tidak bisa melakukan prediksi. API tidak tersedia dan model lokal tidak ditemukan.")
 
+def get_comparables(diamond, k=5):
+    """Diamond pembanding dari dataset referensi - coba API dulu, fallback ke index lokal"""
+    try:
+        response = requests.post(f"{API_URL}/comparables", json={**diamond, "k": k}, timeout=10)
+        if response.status_code == 200:
+            data = response.json()
+            if data.get('success'):
+                return data['comparables']
+    except Exception:
+        pass
+    
+    index = load_comparables()
+    if index is not None:
+        return index.query(diamond, k=k)
+    return None
+
 def render_compact_form(prefix=""):
     """Form input untuk karakteristik diamond"""
     
     # Row 1: Carat & Cut
     col1, col2 = st.columns(2)
     with col1:
-        carat = st.number_input("Carat", min_value=0.2, max_value=5.0, value=0.5, step=0.01, key=f"{prefix}carat")
-        st.markdown('<p class="range-info">0.2 - 5.0 ct</p>', unsafe_allow_html=True)
+        carat = st.number_input("Carat", min_value=CARAT_RANGE[0], max_value=CARAT_RANGE[1], value=0.5, step=0.01, key=f"{prefix}carat")
+        st.markdown(f'<p class="range-info">{CARAT_RANGE[0]} - {CARAT_RANGE[1]} ct</p>', unsafe_allow_html=True)
     with col2:
         cut = st.selectbox("Cut", options=CUT_OPTIONS, index=4, key=f"{prefix}cut")
         st.markdown('<p class="range-info">Fair - Ideal (terbaik)</p>', unsafe_allow_html=True)
@@ -465,8 +497,8 @@ def render_compact_form(prefix=""):
         st.markdown('<p class="range-info">I1 (terburuk) - IF (terbaik)</p>', unsafe_allow_html=True)
     
     # Row 3: Table only
-    table = st.number_input("Table", min_value=43.0, max_value=95.0, value=57.0, step=0.1, key=f"{prefix}table")
-    st.markdown('<p class="range-info">43% - 95%</p>', unsafe_allow_html=True)
+    table = st.number_input("Table", min_value=TABLE_RANGE[0], max_value=TABLE_RANGE[1], value=57.0, step=0.1, key=f"{prefix}table")
+    st.markdown(f'<p class="range-info">{TABLE_RANGE[0]:g}% - {TABLE_RANGE[1]:g}%</p>', unsafe_allow_html=True)
     
     return carat, cut, color, clarity, table
 
@@ -510,17 +542,20 @@ def main():
     """, unsafe_allow_html=True)
     
     # Check if model exists
-    if not os.path.exists('model.pkl'):
+    if not (os.path.exists('model.pkl') or os.path.exists('model.bundle')):
         st.error("Model belum di-train! Jalankan python train_model.py terlebih dahulu.")
         return
     
     # Load model
     try:
-        model, encoder, features = load_model()
+        predictor = load_model()
     except Exception as e:
         st.error(f"Error loading model: {e}")
         return
     
+    # Kurs USD ke IDR dari tabel kurs
+    usd_to_idr = load_rates().rate('IDR')
+    
     # Mode selector - centered
     col_left, col_center, col_right = st.columns([1, 2, 1])
     with col_center:
@@ -545,10 +580,10 @@ def main():
             st.markdown("")
             
             if st.button("Prediksi Harga", type="primary", use_container_width=True):
-                price = predict_price(model, encoder, features, carat, cut, color, clarity, table)
+                price = predict_price(predictor, carat, cut, color, clarity, table)
                 
                 # Result card with ID for scrolling
-                price_idr = price * 15500  # Kurs USD ke IDR
+                price_idr = price * usd_to_idr
                 st.markdown(f"""
                 <div class="result-card" id="estimasi-harga">
                     <div class="label">Estimasi Harga</div>
@@ -569,6 +604,24 @@ def main():
                 </table>
                 """, unsafe_allow_html=True)
                 
+                # Diamond pembanding dari dataset referensi (jika tersedia)
+                comparables = get_comparables({
+                    "carat": carat, "cut": cut, "color": color, "clarity": clarity, "table": table
+                })
+                if comparables:
+                    rows = "".join(
+                        f"<tr><td>{c['carat']:.2f} ct</td><td>{c['cut']}</td><td>{c['color']}</td>"
+                        f"<td>{c['clarity']}</td><td>{c['table']:.1f}%</td><td>${c['price_usd']:,.0f}</td></tr>"
+                        for c in comparables
+                    )
+                    st.markdown(f"""
+                    <div class="form-title">Diamond Pembanding</div>
+                    <table class="detail-table">
+                        <tr><th>Carat</th><th>Cut</th><th>Color</th><th>Clarity</th><th>Table</th><th>Harga</th></tr>
+                        {rows}
+                    </table>
+                    """, unsafe_allow_html=True)
+                
                 # Smooth scroll to estimasi harga
                 st.components.v1.html("""
                 <script>
@@ -604,14 +657,14 @@ def main():
             compare_clicked = st.button("Bandingkan Harga", type="primary", use_container_width=True)
         
         if compare_clicked:
-            price_a = predict_price(model, encoder, features, carat_a, cut_a, color_a, clarity_a, table_a)
-            price_b = predict_price(model, encoder, features, carat_b, cut_b, color_b, clarity_b, table_b)
+            price_a = predict_price(predictor, carat_a, cut_a, color_a, clarity_a, table_a)
+            price_b = predict_price(predictor, carat_b, cut_b, color_b, clarity_b, table_b)
             
             diff = price_b - price_a
             diff_percent = ((price_b - price_a) / price_a) * 100
-            price_a_idr = price_a * 15500  # Kurs USD ke IDR
-            price_b_idr = price_b * 15500
-            diff_idr = abs(diff) * 15500
+            price_a_idr = price_a * usd_to_idr
+            price_b_idr = price_b * usd_to_idr
+            diff_idr = abs(diff) * usd_to_idr
             
             st.divider()
             
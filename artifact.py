@@ -0,0 +1,285 @@
+"""
+Diamond Price Prediction - Model Artifact
+Satu file artefak (model, encoder, features) dengan manifest, plus warm cache.
+
+Format `model.bundle`:
+
+    MAGIC (8 byte) | panjang manifest (8 byte, little endian) | manifest JSON | payload
+
+Payload adalah joblib dump {model, encoder, features}. Manifest berisi
+hash dan ukuran payload, urutan features, list kategori, dan versi
+sklearn/numpy, jadi bisa divalidasi tanpa membaca payload.
+
+Saat load:
+1. Validasi murah: magic, ukuran file vs manifest, features dan kategori
+   vs schema validasi, versi sklearn
+2. Warm cache (MODEL_CACHE_DIR): ModelBundle yang sudah dibangun di-dump
+   tanpa kompresi dengan nama berisi hash payload, lalu di-load dengan
+   mmap. Hash payload hanya dihitung ulang jika file artefak berubah
+   (ukuran / mtime beda dengan stamp cache)
+3. Cold: verifikasi SHA-256 payload, unpickle, build ModelBundle, tulis cache
+
+Usage:
+    python artifact.py build --model-dir . -o model.bundle
+    python artifact.py verify model.bundle
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import time
+import warnings
+
+import joblib
+import numpy as np
+import sklearn
+
+from bundle import ModelBundle, file_sha256
+from validation import REQUIRED_FIELDS, VALID_CUTS, VALID_COLORS, VALID_CLARITIES
+
+MAGIC = b'DPBNDL01'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sQ')
+
+CATEGORIES = {'cut': VALID_CUTS, 'color': VALID_COLORS, 'clarity': VALID_CLARITIES}
+
+
+class ArtifactError(Exception):
+    """Artefak model tidak valid / rusak / tidak tersedia"""
+
+
+def is_lfs_pointer(path):
+    """True jika file berupa Git LFS pointer (bukan isi file sebenarnya)"""
+    with open(path, 'rb') as f:
+        return f.read(20).startswith(b'version https://git')
+
+
+def build_artifact(model, encoder, features, path, model_version=None):
+    """Tulis model, encoder, features ke satu file artefak dengan manifest"""
+    tmp_payload = f"{path}.{os.getpid()}.payload"
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        joblib.dump({'model': model, 'encoder': encoder, 'features': list(features)}, tmp_payload)
+        digest = hashlib.sha256()
+        with open(tmp_payload, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        payload_sha256 = digest.hexdigest()
+
+        manifest = {
+            "format": FORMAT_VERSION,
+            "model_version": model_version or payload_sha256[:12],
+            "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            "payload_sha256": payload_sha256,
+            "payload_bytes": os.path.getsize(tmp_payload),
+            "model_type": type(model).__name__,
+            "n_estimators": getattr(model, 'n_estimators', None),
+            "features": list(features),
+            "categories": {
+                name: [str(v) for v in values]
+                for name, values in zip(CATEGORIES, encoder.categories_)
+            },
+            "sklearn_version": sklearn.__version__,
+            "numpy_version": np.__version__
+        }
+        manifest_bytes = json.dumps(manifest, indent=2).encode()
+        with open(tmp_path, 'wb') as out, open(tmp_payload, 'rb') as payload:
+            out.write(HEADER.pack(MAGIC, len(manifest_bytes)))
+            out.write(manifest_bytes)
+            for block in iter(lambda: payload.read(1024 * 1024), b''):
+                out.write(block)
+        os.replace(tmp_path, path)
+        return manifest
+    finally:
+        for leftover in (tmp_payload, tmp_path):
+            if os.path.exists(leftover):
+                os.unlink(leftover)
+
+
+def read_manifest(path):
+    """
+    Baca manifest dari header artefak (tanpa membaca payload).
+
+    Returns:
+        (manifest, payload_offset)
+    """
+    try:
+        with open(path, 'rb') as f:
+            magic, length = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ArtifactError(f"{path}: not a model bundle (bad magic)")
+            manifest = json.loads(f.read(length))
+    except (OSError, struct.error, ValueError) as e:
+        raise ArtifactError(f"{path}: unreadable manifest: {e}") from e
+    return manifest, HEADER.size + length
+
+
+def validate_manifest(path, manifest, offset, strict_version=False):
+    """Validasi murah: ukuran payload, features, kategori, versi sklearn"""
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ArtifactError(f"{path}: unsupported bundle format {manifest.get('format')}")
+    expected_size = offset + manifest['payload_bytes']
+    actual_size = os.path.getsize(path)
+    if actual_size != expected_size:
+        raise ArtifactError(f"{path}: size {actual_size} does not match manifest ({expected_size}), "
+                            f"file is truncated or corrupted")
+    if sorted(manifest['features']) != sorted(REQUIRED_FIELDS):
+        raise ArtifactError(f"{path}: features {manifest['features']} do not match "
+                            f"input schema {REQUIRED_FIELDS}")
+    for name, values in CATEGORIES.items():
+        if sorted(manifest['categories'].get(name, [])) != sorted(values):
+            raise ArtifactError(f"{path}: {name} categories {manifest['categories'].get(name)} "
+                                f"do not match input schema {values}")
+    if manifest['sklearn_version'] != sklearn.__version__:
+        message = (f"{path}: built with scikit-learn {manifest['sklearn_version']}, "
+                   f"running {sklearn.__version__}")
+        if strict_version:
+            raise ArtifactError(message)
+        warnings.warn(message)
+
+
+def payload_sha256(path, offset):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def verify_payload(path, manifest, offset):
+    actual = payload_sha256(path, offset)
+    if actual != manifest['payload_sha256']:
+        raise ArtifactError(f"{path}: payload sha256 {actual[:12]} does not match "
+                            f"manifest {manifest['payload_sha256'][:12]}, file is corrupted")
+
+
+def _artifact_stamp(path):
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def cache_paths(cache_dir, manifest):
+    """Path file engine dan stamp di warm cache untuk artefak ini"""
+    key = f"engine-{manifest['payload_sha256'][:16]}-sklearn{sklearn.__version__}"
+    return os.path.join(cache_dir, f"{key}.joblib"), os.path.join(cache_dir, f"{key}.json")
+
+
+def _load_warm(path, manifest, offset, cache_dir):
+    """
+    ModelBundle dari warm cache, atau None jika cache belum ada / rusak.
+
+    File engine selalu diverifikasi dengan hash di stamp sebelum di-unpickle;
+    hash payload artefak hanya dihitung ulang jika file artefak berubah.
+    """
+    engine_path, stamp_path = cache_paths(cache_dir, manifest)
+    if not os.path.exists(engine_path):
+        return None
+    try:
+        with open(stamp_path) as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        stamp = None
+    if not isinstance(stamp, dict) or 'engine_sha256' not in stamp:
+        print("⚠️ Model cache has no valid stamp, rebuilding")
+        return None
+    if (os.path.getsize(engine_path) != stamp.get('engine_size')
+            or file_sha256(engine_path) != stamp['engine_sha256']):
+        print(f"⚠️ Model cache {os.path.basename(engine_path)} does not match its stamp, rebuilding")
+        return None
+    if stamp.get('artifact') != _artifact_stamp(path):
+        # File artefak berubah sejak cache dibuat: pastikan isinya masih sama
+        verify_payload(path, manifest, offset)
+        _write_stamp(path, stamp_path, stamp['engine_sha256'], stamp['engine_size'])
+    try:
+        return joblib.load(engine_path, mmap_mode='r')
+    except Exception as e:
+        print(f"⚠️ Model cache unreadable, rebuilding: {e}")
+        return None
+
+
+def _write_stamp(path, stamp_path, engine_sha256, engine_size):
+    stamp = {"artifact": _artifact_stamp(path), "engine_sha256": engine_sha256,
+             "engine_size": engine_size}
+    tmp_path = f"{stamp_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(stamp, f)
+    os.replace(tmp_path, stamp_path)
+
+
+def _write_cache(path, bundle, manifest, cache_dir):
+    engine_path, stamp_path = cache_paths(cache_dir, manifest)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{engine_path}.{os.getpid()}.tmp"
+        joblib.dump(bundle, tmp_path)
+        engine_sha256, engine_size = file_sha256(tmp_path), os.path.getsize(tmp_path)
+        os.replace(tmp_path, engine_path)
+        _write_stamp(path, stamp_path, engine_sha256, engine_size)
+    except OSError as e:
+        # Cache hanya optimasi startup, kegagalan tulis tidak fatal
+        print(f"⚠️ Could not write model cache: {e}")
+
+
+def load_artifact(path, cache_dir=None, strict_version=False, version=None):
+    """
+    Load ModelBundle dari artefak, lewat warm cache jika tersedia.
+
+    Args:
+        cache_dir: folder warm cache (None = tanpa cache)
+        strict_version: gagal (bukan warning) jika versi sklearn beda
+        version: override versi model (default dari manifest)
+
+    Raises:
+        ArtifactError: artefak tidak valid / rusak
+    """
+    if is_lfs_pointer(path):
+        raise ArtifactError(f"{path} is a Git LFS pointer, not the artifact")
+    manifest, offset = read_manifest(path)
+    validate_manifest(path, manifest, offset, strict_version)
+
+    bundle = _load_warm(path, manifest, offset, cache_dir) if cache_dir else None
+    if bundle is None:
+        verify_payload(path, manifest, offset)
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            payload = joblib.load(f)
+        if list(payload['features']) != manifest['features']:
+            raise ArtifactError(f"{path}: payload features do not match manifest")
+        bundle = ModelBundle(payload['model'], payload['encoder'], payload['features'],
+                             manifest['model_version'])
+        if cache_dir:
+            _write_cache(path, bundle, manifest, cache_dir)
+    bundle.version = version or manifest['model_version']
+    bundle.manifest = manifest
+    return bundle
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model bundle artifact")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_build = sub.add_parser('build', help="Bundle model.pkl, encoder.pkl, features.pkl")
+    p_build.add_argument('--model-dir', default='.')
+    p_build.add_argument('-o', '--output', default='model.bundle')
+    p_build.add_argument('--version', help="Versi model (default: hash payload)")
+    p_verify = sub.add_parser('verify', help="Validasi manifest dan hash payload")
+    p_verify.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        model = joblib.load(os.path.join(args.model_dir, 'model.pkl'))
+        encoder = joblib.load(os.path.join(args.model_dir, 'encoder.pkl'))
+        features = joblib.load(os.path.join(args.model_dir, 'features.pkl'))
+        manifest = build_artifact(model, encoder, features, args.output, args.version)
+        print(json.dumps(manifest, indent=2))
+    else:
+        manifest, offset = read_manifest(args.path)
+        validate_manifest(args.path, manifest, offset)
+        verify_payload(args.path, manifest, offset)
+        print(f"✅ {args.path}: model {manifest['model_version']} OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+Diamond Price Prediction - Audit Log
+Pencatatan setiap quote prediksi untuk kebutuhan compliance.
+
+Request path hanya memasukkan record ke buffer in-memory (bounded).
+Background thread mengambil record per batch dan menulisnya ke file
+JSONL terkompresi gzip yang di-rotate berdasarkan ukuran dan umur file.
+
+Policy jika buffer penuh (disk lambat):
+- "drop": record baru dibuang dan dihitung di `dropped` (default)
+- "block": request menunggu maksimal `block_timeout` detik, lalu drop
+"""
+
+import atexit
+import gzip
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from forksafe import ProcessOwner
+
+
+class AuditLog:
+    """
+    Audit log async dengan ring buffer dan writer thread.
+
+    Args:
+        directory: folder output file audit-*.jsonl.gz
+        capacity: jumlah maksimum record di buffer
+        batch_size: jumlah record per tulis
+        flush_interval: detik maksimum record menunggu di buffer
+        max_file_bytes: ukuran (sebelum kompresi) sebelum file di-rotate
+        max_file_age: detik sebelum file di-rotate
+        policy: "drop" atau "block"
+    """
+
+    def __init__(self, directory, capacity=10000, batch_size=500, flush_interval=1.0,
+                 max_file_bytes=64 * 1024 * 1024, max_file_age=3600,
+                 policy='drop', block_timeout=0.01):
+        if policy not in ('drop', 'block'):
+            raise ValueError(f"Unknown audit policy: {policy}")
+        self.directory = directory
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_file_age = max_file_age
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+        self.written = 0
+        self.dropped = 0
+        self.last_error = None
+
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._owner = ProcessOwner()
+        self._file = None
+        self._file_bytes = 0
+        self._file_opened = 0.0
+        self._file_seq = 0
+
+    def record(self, entry):
+        """Masukkan satu record ke buffer. Returns False jika record di-drop."""
+        return self.record_many([entry])
+
+    def record_many(self, entries):
+        """Masukkan beberapa record sekaligus (satu kali lock)"""
+        with self._cond:
+            if len(self._buffer) + len(entries) > self.capacity and self.policy == 'block':
+                self._cond.wait_for(
+                    lambda: len(self._buffer) + len(entries) <= self.capacity,
+                    timeout=self.block_timeout
+                )
+            free = self.capacity - len(self._buffer)
+            if free < len(entries):
+                self.dropped += len(entries) - max(free, 0)
+                entries = entries[:max(free, 0)]
+            self._buffer.extend(entries)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify_all()
+        return len(entries) > 0
+
+    def start(self):
+        """Start writer thread (idempotent, aman setelah fork)"""
+        if self._thread is not None and self._thread.is_alive() and self._owner.owned():
+            return
+        if self._owner.claim():
+            # Proses hasil fork: buffer, file handle, dan lock milik parent
+            # (lock bisa ter-copy dalam keadaan terkunci oleh writer parent)
+            self._buffer.clear()
+            self._file = None
+            self._cond = threading.Condition()
+            self._stop = threading.Event()
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop writer thread dan flush semua record yang tersisa"""
+        if self._thread is None or not self._owner.owned():
+            return
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout=10)
+        if self._thread.is_alive():
+            # Writer masih menulis: jangan tulis ke file yang sama dari thread ini
+            self.last_error = "Audit writer did not stop within 10s, remaining records not flushed"
+            print(f"⚠️ {self.last_error}")
+            return
+        self._thread = None
+        self._write(self._drain(len(self._buffer)))
+        self._close_file()
+
+    def stats(self):
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "policy": self.policy,
+            "last_error": self.last_error
+        }
+
+    def _drain(self, limit):
+        with self._cond:
+            batch = [self._buffer.popleft() for _ in range(min(limit, len(self._buffer)))]
+            self._cond.notify_all()
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: len(self._buffer) >= self.batch_size or self._stop.is_set(),
+                    timeout=self.flush_interval
+                )
+            batch = self._drain(self.batch_size)
+            while batch:
+                self._write(batch)
+                batch = self._drain(self.batch_size) if len(self._buffer) >= self.batch_size else []
+            if self._file is not None:
+                self._maybe_rotate()
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            data = ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in batch)
+            encoded = data.encode('utf-8')
+            f = self._current_file()
+            f.write(encoded)
+            # Sync flush supaya file bisa dibaca walaupun belum ditutup
+            f.flush()
+            self._file_bytes += len(encoded)
+            with self._cond:
+                self.written += len(batch)
+            self.last_error = None
+        except Exception as e:
+            with self._cond:
+                self.dropped += len(batch)
+            self.last_error = str(e)
+            self._close_file()
+
+    def _current_file(self):
+        if self._file is None:
+            self._file_seq += 1
+            name = time.strftime('audit-%Y%m%d-%H%M%S', time.gmtime())
+            path = os.path.join(self.directory, f"{name}-{os.getpid()}-{self._file_seq:04d}.jsonl.gz")
+            self._file = gzip.open(path, 'ab', compresslevel=6)
+            self._file_bytes = 0
+            self._file_opened = time.time()
+        return self._file
+
+    def _maybe_rotate(self):
+        if (self._file_bytes >= self.max_file_bytes
+                or time.time() - self._file_opened >= self.max_file_age):
+            self._close_file()
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception as e:
+                self.last_error = str(e)
+            self._file = None
+
+
+def create_audit_log():
+    """Buat AuditLog dari environment variable, None jika dinonaktifkan"""
+    if os.environ.get('AUDIT_ENABLED', '1') != '1':
+        return None
+    audit = AuditLog(
+        os.environ.get('AUDIT_DIR', 'audit_logs'),
+        capacity=int(os.environ.get('AUDIT_CAPACITY', 10000)),
+        batch_size=int(os.environ.get('AUDIT_BATCH_SIZE', 500)),
+        flush_interval=float(os.environ.get('AUDIT_FLUSH_INTERVAL', 1.0)),
+        max_file_bytes=int(os.environ.get('AUDIT_MAX_FILE_MB', 64)) * 1024 * 1024,
+        policy=os.environ.get('AUDIT_POLICY', 'drop')
+    )
+    atexit.register(audit.close)
+    return audit
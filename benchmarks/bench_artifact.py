@@ -0,0 +1,146 @@
+"""
+Benchmark startup API dengan artefak model tunggal.
+
+Setiap kasus dijalankan di proses baru (`import api`, termasuk load model)
+dan diukur waktu startup serta apakah model berhasil di-load:
+
+- legacy: model.pkl + encoder.pkl + features.pkl
+- bundle cold: warm cache kosong (verifikasi hash + unpickle + tulis cache)
+- bundle warm: load engine dari warm cache (mmap)
+- bundle warm, file di-touch: stamp beda, hash payload dihitung ulang
+- corrupted: artefak terpotong, satu byte payload diubah (cold dan warm),
+  magic rusak, dan LFS pointer dengan MODEL_OFFLINE=1
+- engine di warm cache rusak: hash tidak cocok dengan stamp, cache dibangun
+  ulang dari artefak
+
+Usage:
+    python benchmarks/bench_artifact.py [--repeat 3]
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from common import ROOT, load_or_train
+from artifact import build_artifact, read_manifest
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import api
+print(json.dumps({"startup": time.perf_counter() - start, "loaded": api.model is not None}))
+"""
+
+
+def startup(workdir, env, cwd=None):
+    env = {**os.environ, 'AUDIT_ENABLED': '0', 'PYTHONWARNINGS': 'ignore',
+           'PYTHONPATH': ROOT, 'MODEL_CACHE_DIR': os.path.join(workdir, 'cache'), **env}
+    out = subprocess.run([sys.executable, '-c', CHILD], cwd=cwd or ROOT, env=env,
+                         capture_output=True, text=True)
+    lines = out.stdout.strip().splitlines()
+    result = json.loads(lines[-1])
+    errors = [line for line in lines if line.startswith('❌')]
+    result['error'] = errors[0][2:].strip() if errors else ''
+    return result
+
+
+def corrupt(src, dst, how):
+    shutil.copyfile(src, dst)
+    if how == 'truncate':
+        with open(dst, 'r+b') as f:
+            f.truncate(os.path.getsize(dst) - 1000)
+    elif how == 'flip':
+        _, offset = read_manifest(src)
+        with open(dst, 'r+b') as f:
+            f.seek(offset + (os.path.getsize(dst) - offset) // 2)
+            byte = f.read(1)
+            f.seek(-1, os.SEEK_CUR)
+            f.write(bytes([byte[0] ^ 0xFF]))
+    elif how == 'magic':
+        with open(dst, 'r+b') as f:
+            f.write(b'XXXXXXXX')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        model, encoder, features = load_or_train()
+        bundle_path = os.path.join(workdir, 'model.bundle')
+        build_artifact(model, encoder, features, bundle_path)
+        del model
+        print(f"artifact: {os.path.getsize(bundle_path) / 2**20:,.0f} MB\n")
+
+        # Folder dengan LFS pointer untuk kasus offline
+        pointer_dir = os.path.join(workdir, 'pointer')
+        os.makedirs(pointer_dir)
+        for name in ('model.pkl', 'encoder.pkl', 'features.pkl'):
+            with open(os.path.join(pointer_dir, name), 'w') as f:
+                f.write("version https://git-lfs.github.com/spec/v1\noid sha256:0\nsize 0\n")
+
+        cache_dir = os.path.join(workdir, 'cache')
+        bundle = {'MODEL_ARTIFACT': bundle_path}
+
+        def cold():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        def warm():
+            if not os.path.isdir(cache_dir) or not os.listdir(cache_dir):
+                startup(workdir, bundle)
+
+        def touch():
+            warm()
+            os.utime(bundle_path)
+
+        def broken_engine():
+            warm()
+            engine_path = glob.glob(os.path.join(cache_dir, '*.joblib'))[0]
+            with open(engine_path, 'r+b') as f:
+                f.seek(os.path.getsize(engine_path) // 2)
+                byte = f.read(1)
+                f.seek(-1, os.SEEK_CUR)
+                f.write(bytes([byte[0] ^ 0xFF]))
+
+        def broken(how, warm_cache):
+            def prepare():
+                warm() if warm_cache else cold()
+                corrupt(bundle_path, os.path.join(workdir, 'broken.bundle'), how)
+            return prepare
+
+        broken_env = {'MODEL_ARTIFACT': os.path.join(workdir, 'broken.bundle')}
+        cases = [
+            ("legacy 3 x .pkl", {'MODEL_ARTIFACT': os.path.join(workdir, 'missing.bundle')}, None, None),
+            ("bundle, cold cache", bundle, cold, None),
+            ("bundle, warm cache", bundle, warm, None),
+            ("bundle, warm cache, file touched", bundle, touch, None),
+            ("bundle, warm cache engine corrupted", bundle, broken_engine, None),
+            ("corrupted: truncated", broken_env, broken('truncate', False), None),
+            ("corrupted: flipped byte, cold", broken_env, broken('flip', False), None),
+            ("corrupted: flipped byte, warm", broken_env, broken('flip', True), None),
+            ("corrupted: bad magic", broken_env, broken('magic', False), None),
+            ("LFS pointer, MODEL_OFFLINE=1", {'MODEL_OFFLINE': '1', 'MODEL_ARTIFACT': 'none'},
+             None, pointer_dir),
+        ]
+
+        print("| Case | Startup (s) | Model loaded | Error |")
+        print("|------|-------------|--------------|-------|")
+        for name, env, prepare, cwd in cases:
+            times = []
+            for _ in range(args.repeat):
+                if prepare is not None:
+                    prepare()
+                result = startup(workdir, env, cwd)
+                times.append(result['startup'])
+            print(f"| {name} | {min(times):.2f} | {'yes' if result['loaded'] else 'no'} | "
+                  f"{result['error'][:90]} |")
+
+
+if __name__ == '__main__':
+    main()
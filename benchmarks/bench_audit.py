@@ -0,0 +1,94 @@
+"""
+Benchmark audit log.
+
+Mengukur biaya AuditLog.record di request path, latency /predict dengan
+dan tanpa audit, serta perilaku drop saat writer lebih lambat dari
+traffic.
+
+Usage:
+    python benchmarks/bench_audit.py
+"""
+
+import gzip
+import glob
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from common import ROOT  # noqa: F401  (menambahkan root repo ke sys.path)
+from audit import AuditLog
+
+DIAMOND = {"carat": 0.9, "cut": "Ideal", "color": "G", "clarity": "VS2", "table": 57.0}
+
+
+def entry(i):
+    return {"ts": time.time(), "request_id": f"{i:032x}", "endpoint": "predict",
+            "client": "ip:127.0.0.1", "model_version": "abc123", "latency_ms": 12.3,
+            "input": DIAMOND, "price_usd": 4321.0}
+
+
+def bench_record():
+    with tempfile.TemporaryDirectory() as tmp:
+        audit = AuditLog(tmp, capacity=200000)
+        audit.start()
+        n = 100000
+        start = time.perf_counter()
+        for i in range(n):
+            audit.record(entry(i))
+        per_call = (time.perf_counter() - start) / n
+        audit.close()
+        lines = sum(1 for path in glob.glob(os.path.join(tmp, '*.gz'))
+                    for _ in gzip.open(path))
+        print(f"record(): {per_call * 1e6:.2f} us/call, written={audit.written} "
+              f"dropped={audit.dropped} lines on disk={lines}")
+
+
+def bench_slow_disk():
+    with tempfile.TemporaryDirectory() as tmp:
+        audit = AuditLog(tmp, capacity=1000, batch_size=100, policy='drop')
+        original = audit._write
+
+        def slow_write(batch):
+            time.sleep(0.05)
+            original(batch)
+        audit._write = slow_write
+        audit.start()
+        for i in range(20000):
+            audit.record(entry(i))
+        audit.close()
+        print(f"slow disk (drop policy): written={audit.written} dropped={audit.dropped} "
+              f"buffer capacity={audit.capacity}")
+
+
+def bench_api():
+    import api
+    client = api.app.test_client()
+    latencies = {}
+    for enabled in (False, True):
+        saved = api.audit_log
+        if not enabled:
+            api.audit_log = None
+        samples = []
+        for _ in range(300):
+            start = time.perf_counter()
+            client.post('/predict', json=DIAMOND, headers={"X-API-Key": f"bench-{enabled}"})
+            samples.append(time.perf_counter() - start)
+        api.audit_log = saved
+        latencies[enabled] = np.array(samples[20:]) * 1e3
+    for enabled, lat in latencies.items():
+        print(f"/predict audit={'on ' if enabled else 'off'}: "
+              f"p50={np.percentile(lat, 50):.2f} ms p99={np.percentile(lat, 99):.2f} ms")
+
+
+def main():
+    bench_record()
+    bench_slow_disk()
+    os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+    os.environ.setdefault('AUDIT_DIR', tempfile.mkdtemp())
+    bench_api()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark index diamond pembanding (KD-tree).
+
+Untuk setiap ukuran dataset referensi sintetis diukur:
+- build index dari CSV (baca + validasi + build KD-tree + simpan ke disk)
+- load index dari cache disk (startup berikutnya)
+- memory index (RSS setelah build dikurangi RSS sebelum) dan ukuran file cache
+- latency query k=5 (mode weighted dan exact) dibanding brute force NumPy
+
+Usage:
+    python benchmarks/bench_comparables.py [--sizes 50000 5000000] [--queries 1000]
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from common import synthetic_diamonds
+from comparables import CATEGORICAL, ComparablesIndex, load_index, read_reference
+
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def latency(index, diamonds, **kwargs):
+    """Latency per query (ms): p50, p99"""
+    times = []
+    for diamond in diamonds:
+        start = time.perf_counter()
+        index.query(diamond, **kwargs)
+        times.append(time.perf_counter() - start)
+    times = np.array(times) * 1e3
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+
+def brute_force_p50(index, points, diamonds, k=5):
+    """Latency p50 (ms) scan linear semua titik (tanpa index)"""
+    times = []
+    for diamond in diamonds[:100]:
+        start = time.perf_counter()
+        codes = {name: np.array([values.index(diamond[name])]) for name, values in CATEGORICAL.items()}
+        q = index._points(np.array([diamond['carat']]), np.array([diamond['table']]), codes)
+        dist = ((points - q) ** 2).sum(axis=1)
+        np.argpartition(dist, k)[:k]
+        times.append(time.perf_counter() - start)
+    return np.percentile(np.array(times) * 1e3, 50)
+
+
+def run(n, n_queries, workdir):
+    path = os.path.join(workdir, f'reference-{n}.csv')
+    synthetic_diamonds(n, seed=5).to_csv(path, index=False)
+    cache_dir = os.path.join(workdir, 'cache')
+
+    gc.collect()
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    df = read_reference(path)
+    read_s = time.perf_counter() - start
+    start = time.perf_counter()
+    index = ComparablesIndex(df)
+    build_s = time.perf_counter() - start
+    del df
+    gc.collect()
+    memory = rss_mb() - rss_before
+    del index
+    gc.collect()
+
+    start = time.perf_counter()
+    load_index(path, cache_dir)
+    cold_s = time.perf_counter() - start
+    cache_file = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+    start = time.perf_counter()
+    index = load_index(path, cache_dir)
+    warm_s = time.perf_counter() - start
+
+    queries = synthetic_diamonds(n_queries, seed=6).drop(columns='price').to_dict('records')
+    weighted = latency(index, queries, k=5)
+    exact = latency(index, queries, k=5, exact=True)
+    points = index._points(index.carat, index.table, index.codes)
+    brute = brute_force_p50(index, points, queries)
+
+    print(f"| {n:,} | {read_s:.2f} | {build_s:.2f} | {cold_s:.2f} | {warm_s:.2f} | "
+          f"{memory:,.0f} | {os.path.getsize(cache_file) / 2**20:,.0f} | "
+          f"{weighted[0]:.3f} / {weighted[1]:.3f} | {exact[0]:.3f} / {exact[1]:.3f} | {brute:.2f} |")
+
+    os.unlink(cache_file)
+    os.unlink(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50000, 5000000])
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+
+    print("| Rows | Read CSV (s) | Build (s) | Cold start (s) | Warm start (s) | Memory (MB) | "
+          "Cache file (MB) | Weighted p50 / p99 (ms) | Exact p50 / p99 (ms) | Brute force p50 (ms) |")
+    print("|------|--------------|-----------|----------------|----------------|-------------|"
+          "-----------------|-------------------------|----------------------|----------------------|")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.sizes:
+            run(n, args.queries, workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Benchmark konversi multi-currency.
+
+Mengukur biaya per baris RateTable.convert untuk 1 vs semua mata uang,
+dibanding biaya prediksi model per baris.
+
+Usage:
+    python benchmarks/bench_currency.py
+"""
+
+import numpy as np
+
+from common import encode_frame, load_or_train, synthetic_diamonds, timeit
+from currency import load_rate_table
+
+
+def main():
+    rates = load_rate_table(ttl=0)
+    all_codes = list(rates.currencies)
+
+    model, encoder, features = load_or_train()
+    model.set_params(n_jobs=1)
+
+    print(f"{'rows':>8} {'predict ns/row':>15} {'IDR ns/row':>11} "
+          f"{f'{len(all_codes)} cur ns/row':>13}")
+    for n in (1, 1000, 100000):
+        prices = np.random.default_rng(0).uniform(300, 20000, n)
+        t_one = timeit(lambda: rates.convert(prices, ['IDR']), number=100)
+        t_all = timeit(lambda: rates.convert(prices, all_codes), number=100)
+        X = encode_frame(synthetic_diamonds(min(n, 1000)), encoder, features)
+        t_predict = timeit(lambda: model.predict(X), repeat=3) / len(X)
+        print(f"{n:>8} {t_predict * 1e9:>15,.0f} {t_one / n * 1e9:>11,.1f} "
+              f"{t_all / n * 1e9:>13,.1f}")
+
+
+if __name__ == '__main__':
+    main()
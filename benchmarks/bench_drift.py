@@ -0,0 +1,48 @@
+"""
+Benchmark drift monitor.
+
+Mengukur biaya DriftMonitor.update per request (1 baris) dan per baris
+untuk batch, lalu menampilkan skor PSI/KS untuk traffic yang sama dengan
+baseline dan traffic yang bergeser ke batu besar (> 3 ct).
+
+Usage:
+    python benchmarks/bench_drift.py
+"""
+
+import numpy as np
+
+from common import synthetic_diamonds, timeit
+from drift import DriftMonitor, build_baseline
+
+
+def main():
+    baseline = build_baseline(synthetic_diamonds(50000, seed=1))
+    rows = synthetic_diamonds(1000, seed=2).to_dict('records')
+
+    monitor = DriftMonitor()
+    t_single = timeit(lambda: [monitor.update([row]) for row in rows], repeat=5) / len(rows)
+    t_batch = timeit(lambda: monitor.update(rows), repeat=5) / len(rows)
+    t_report = timeit(lambda: monitor.report(baseline), repeat=5, number=10)
+    print(f"update 1 row:        {t_single * 1e6:.2f} us/request")
+    print(f"update 1000-row batch: {t_batch * 1e6:.2f} us/row")
+    print(f"report():            {t_report * 1e3:.2f} ms")
+
+    same = DriftMonitor()
+    same.update(synthetic_diamonds(5000, seed=3).to_dict('records'))
+    shifted_df = synthetic_diamonds(5000, seed=4)
+    big = np.random.default_rng(5).random(len(shifted_df)) < 0.4
+    shifted_df.loc[big, 'carat'] = np.random.default_rng(6).uniform(3.0, 5.0, big.sum()).round(2)
+    shifted = DriftMonitor()
+    shifted.update(shifted_df.to_dict('records'))
+
+    for name, monitor in (("same distribution", same), ("40% > 3 ct", shifted)):
+        features = monitor.report(baseline)["features"]
+        scores = ", ".join(
+            f"{f}: psi={v['psi']:.3f}" + (f" ks={v['ks']:.3f}" if 'ks' in v else "")
+            for f, v in features.items()
+        )
+        print(f"{name:>18}: {scores}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark prediction interval per-tree.
+
+Mengukur overhead ForestLeafTable.predict (point estimate + kuantil dalam
+satu traversal) dibanding model.predict biasa, serta empirical coverage
+interval di held-out set.
+
+Usage:
+    python benchmarks/bench_intervals.py [--data diamonds.csv] [--level 0.9]
+
+Tanpa --data, held-out set diambil dari data sintetis.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from common import encode_frame, load_or_train, synthetic_diamonds, timeit
+from intervals import ForestLeafTable
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', help="CSV held-out dengan kolom carat,cut,color,clarity,table,price")
+    parser.add_argument('--level', type=float, default=0.9)
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+
+    model, encoder, features = load_or_train()
+    model.set_params(n_jobs=1)
+    table = ForestLeafTable(model)
+
+    if args.data:
+        holdout = pd.read_csv(args.data)
+    else:
+        holdout = synthetic_diamonds(args.rows, seed=7)
+    X = encode_frame(holdout, encoder, features)
+    alpha = (1.0 - args.level) / 2.0
+    quantiles = [alpha, 1.0 - alpha]
+
+    mean, q = table.predict(X, quantiles)
+    assert np.allclose(mean, model.predict(X)), "per-tree mean must match model.predict"
+
+    print(f"{'rows':>6} {'predict ms':>12} {'interval ms':>12} {'overhead':>9}")
+    for n in (1, 100, len(X)):
+        Xn = X.iloc[:n]
+        t_plain = timeit(lambda: model.predict(Xn))
+        t_interval = timeit(lambda: table.predict(Xn, quantiles))
+        print(f"{n:>6} {t_plain * 1e3:>12.2f} {t_interval * 1e3:>12.2f} "
+              f"{(t_interval / t_plain - 1) * 100:>8.1f}%")
+
+    log_price = np.log(holdout['price'].to_numpy())
+    covered = (log_price >= q[0]) & (log_price <= q[1])
+    width = np.median(np.exp(q[1]) - np.exp(q[0]))
+    print(f"\nNominal level: {args.level:.2f}")
+    print(f"Empirical coverage: {covered.mean():.3f} on {len(X)} held-out rows")
+    print(f"Median interval width: ${width:,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark job repricing: throughput dan recovery setelah worker di-kill.
+
+1. Throughput: satu worker memproses file CSV sampai selesai.
+2. Recovery: worker di-kill (SIGKILL) di tengah job, lalu worker baru
+   dijalankan. Diukur waktu dari start worker baru sampai job diambil alih
+   dan sampai checkpoint pertama berikutnya, serta jumlah baris yang
+   diproses ulang (chunk yang belum di-checkpoint saat kill).
+
+Usage:
+    python benchmarks/bench_jobs.py [--rows 1000000] [--chunk-size 50000]
+"""
+
+import argparse
+import io
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from common import ROOT, synthetic_diamonds
+from jobs import JobQueue
+
+
+def start_worker(env):
+    return subprocess.Popen([sys.executable, 'jobs.py', 'worker', '--once', '--model-dir', ROOT],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_for(predicate, timeout=1800, interval=0.05):
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        value = predicate()
+        if value:
+            return value
+        time.sleep(interval)
+    raise RuntimeError("timeout")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        input_path = os.path.join(workdir, 'inventory.csv')
+        synthetic_diamonds(args.rows, seed=21).drop(columns='price').to_csv(input_path, index=False)
+        env = {**os.environ, 'JOBS_DB': os.path.join(workdir, 'jobs.db'),
+               'JOBS_DIR': os.path.join(workdir, 'jobs'), 'PYTHONWARNINGS': 'ignore'}
+        queue = JobQueue(env['JOBS_DB'], env['JOBS_DIR'])
+
+        # 1. Throughput tanpa gangguan
+        job_id = queue.submit(input_path, args.chunk_size)
+        start = time.perf_counter()
+        worker = start_worker(env)
+        worker.wait()
+        total_s = time.perf_counter() - start
+        job = queue.get(job_id)
+        assert job['status'] == 'done', job
+        print(f"rows: {args.rows:,}  chunk size: {args.chunk_size:,}  chunks: {job['chunks_total']}")
+        print(f"worker wall time (incl. model load): {total_s:.1f} s")
+        print(f"throughput (claim -> done):          {job['rows_per_second']:,.0f} rows/s")
+        seconds = [row['seconds'] for row in queue._connection().execute(
+            "SELECT seconds FROM checkpoints WHERE job_id = ?", (job_id,))]
+        print(f"per chunk:                           {sum(seconds) / len(seconds):.2f} s")
+
+        # 2. Kill worker di tengah job, lalu resume
+        job_id = queue.submit(input_path, args.chunk_size)
+        half = queue.get(job_id)['chunks_total'] // 2
+        worker = start_worker(env)
+        wait_for(lambda: queue.get(job_id)['chunks_done'] >= half)
+        # Kill di tengah chunk berikutnya (worker sedang bekerja, belum checkpoint)
+        time.sleep(0.5 * sum(seconds) / len(seconds))
+        worker.send_signal(signal.SIGKILL)
+        worker.wait()
+        done_at_kill = queue.get(job_id)['chunks_done']
+
+        restart = time.perf_counter()
+        worker = start_worker(env)
+        wait_for(lambda: queue.get(job_id)['attempts'] >= 2)
+        claimed_s = time.perf_counter() - restart
+        wait_for(lambda: queue.get(job_id)['chunks_done'] > done_at_kill)
+        first_checkpoint_s = time.perf_counter() - restart
+        worker.wait()
+        resumed_s = time.perf_counter() - restart
+        job = queue.get(job_id)
+        assert job['status'] == 'done', job
+
+        results = pd.read_csv(io.BytesIO(b''.join(queue.stream_results(job_id))))
+        assert len(results) == args.rows and results['row'].is_unique
+
+        print(f"\nkilled after {done_at_kill}/{job['chunks_total']} chunks checkpointed")
+        print(f"new worker claimed job:              {claimed_s:.2f} s after start")
+        print(f"first new checkpoint:                {first_checkpoint_s:.2f} s after start")
+        print(f"rows reprocessed (lost work):        <= {args.chunk_size:,} (one partial chunk)")
+        print(f"resumed worker finished:             {resumed_s:.1f} s after start")
+        print(f"output rows: {len(results):,}, unique row ids: {results['row'].is_unique}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark Predictor in-process per tipe input.
+
+Untuk setiap tipe input (NumPy, pandas, Arrow, list dict) dan ukuran
+(1, 1k, 1M baris) diukur:
+- prep: konversi kolom + validasi + encoding (tanpa model)
+- total: Predictor.predict (prep + Random Forest)
+
+Pembanding: jalur lama predict_price_local di app.py (per baris, hanya
+sampai 1k) dan legacy_encode (list dict), encoding yang dipakai api.py sebelumnya.
+Di akhir dicek hasil prediksi dari beberapa thread bersamaan sama dengan
+hasil serial.
+
+Usage:
+    python benchmarks/bench_predictor.py [--sizes 1 1000 1000000]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from common import load_or_train, synthetic_diamonds, timeit
+from bundle import ModelBundle
+from predictor import Predictor
+
+
+def inputs(df):
+    """(nama, data) untuk setiap tipe input"""
+    strings = {c: df[c].to_numpy(dtype=str) if c in ('cut', 'color', 'clarity') else df[c].to_numpy()
+               for c in df.columns}
+    structured = np.rec.fromarrays([strings[c] for c in df.columns], names=list(df.columns))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    dict_type = pa.dictionary(pa.int8(), pa.string())
+    return [
+        ("NumPy dict (str arrays)", strings),
+        ("NumPy structured array", np.asarray(structured)),
+        ("pandas (str dtype)", df),
+        ("pandas (object)", df.astype({c: object for c in ('cut', 'color', 'clarity')})),
+        ("pandas (category)", df.astype({c: 'category' for c in ('cut', 'color', 'clarity')})),
+        ("Arrow Table (string)", table),
+        ("Arrow Table (dictionary)", table.cast(pa.schema(
+            [(f.name, dict_type if pa.types.is_string(f.type) or pa.types.is_large_string(f.type)
+              else f.type) for f in table.schema]))),
+        ("list of dicts", df.to_dict('records')),
+    ]
+
+
+def legacy_encode(bundle, diamonds):
+    """ModelBundle.encode lama dari api.py (list dict -> DataFrame)"""
+    encoded = bundle.encoder.transform([[d['cut'], d['color'], d['clarity']] for d in diamonds])
+    input_data = pd.DataFrame({
+        'carat': [d['carat'] for d in diamonds],
+        'cut': encoded[:, 0],
+        'color': encoded[:, 1],
+        'clarity': encoded[:, 2],
+        'table': [d['table'] for d in diamonds]
+    })
+    return input_data[bundle.features]
+
+
+def legacy_local(bundle, row):
+    """predict_price_local lama dari app.py"""
+    encoded = bundle.encoder.transform([[row['cut'], row['color'], row['clarity']]])
+    input_data = pd.DataFrame({
+        'carat': [row['carat']], 'cut': [encoded[0][0]], 'color': [encoded[0][1]],
+        'clarity': [encoded[0][2]], 'table': [row['table']]
+    })[bundle.features]
+    return np.exp(bundle.model.predict(input_data)[0])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 1000, 1000000])
+    args = parser.parse_args()
+
+    model, encoder, features = load_or_train()
+    model.set_params(n_jobs=1)
+    bundle = ModelBundle(model, encoder, features, 'bench')
+    predictor = Predictor(bundle)
+
+    print("| Input | Rows | Prep (ms) | Prep (µs/row) | Total (ms) |")
+    print("|-------|------|-----------|---------------|------------|")
+    for n in args.sizes:
+        df = synthetic_diamonds(n, seed=31).drop(columns='price')
+        repeat = 20 if n <= 1000 else 1
+        expected = None
+        for name, data in inputs(df):
+            prep = timeit(lambda: bundle.encode_columns(predictor.validate(data).values), repeat=repeat)
+            start = time.perf_counter()
+            prices = predictor.predict(data)
+            total = time.perf_counter() - start
+            if n <= 1000:
+                total = min(total, timeit(lambda: predictor.predict(data), repeat=repeat))
+            if expected is None:
+                expected = prices
+            assert np.array_equal(prices, expected), name
+            print(f"| {name} | {n:,} | {prep * 1e3:.3f} | {prep / n * 1e6:.2f} | {total * 1e3:,.1f} |")
+
+        records = df.to_dict('records')
+        prep = timeit(lambda: legacy_encode(bundle, records), repeat=repeat)
+        print(f"| old api.py: ModelBundle.encode(list of dicts) | {n:,} | {prep * 1e3:.3f} | "
+              f"{prep / n * 1e6:.2f} | - |")
+        if n <= 1000:
+            total = timeit(lambda: [legacy_local(bundle, row) for row in records], repeat=3)
+            print(f"| old app.py: predict_price_local per row | {n:,} | - | - | {total * 1e3:,.1f} |")
+
+    # Thread safety: hasil paralel == hasil serial
+    df = synthetic_diamonds(20000, seed=32).drop(columns='price')
+    parts = [df.iloc[i::8] for i in range(8)]
+    serial = [predictor.predict(part) for part in parts]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        parallel = list(pool.map(predictor.predict, parts * 4))
+    assert all(np.array_equal(a, b) for a, b in zip(parallel, serial * 4))
+    print(f"\n32 concurrent predict() calls from 8 threads match serial results")
+
+
+if __name__ == '__main__':
+    main()
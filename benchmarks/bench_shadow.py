@@ -0,0 +1,93 @@
+"""
+Benchmark shadow/canary evaluation.
+
+Membandingkan latency /predict tanpa kandidat, dengan kandidat mode
+shadow, dan mode canary (10%), memakai default SHADOW_SAMPLE_PERCENT.
+Kandidat adalah forest sintetis dengan seed berbeda, kecuali
+SHADOW_MODEL_DIR sudah diset.
+
+Konfigurasi dijalankan bergantian selama beberapa round; selisih p99
+antar round "no candidate" adalah noise mesin.
+
+Usage:
+    python benchmarks/bench_shadow.py [--requests 300] [--think-ms 20] [--rounds 3]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from common import ROOT, train_synthetic_model
+
+DIAMOND = {"carat": 0.9, "cut": "Ideal", "color": "G", "clarity": "VS2", "table": 57.0}
+
+
+def measure(client, n, think):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        client.post('/predict', json=DIAMOND)
+        samples.append(time.perf_counter() - start)
+        time.sleep(think)
+    return np.array(samples[20:]) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--think-ms', type=float, default=20)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = None
+    if not os.environ.get('SHADOW_MODEL_DIR'):
+        tmp = tempfile.mkdtemp()
+        model, encoder, features = train_synthetic_model(seed=7)
+        joblib.dump(model, os.path.join(tmp, 'model.pkl'))
+        joblib.dump(encoder, os.path.join(tmp, 'encoder.pkl'))
+        joblib.dump(features, os.path.join(tmp, 'features.pkl'))
+        os.environ['SHADOW_MODEL_DIR'] = tmp
+    os.environ.update(RATE_LIMIT_ENABLED='0', AUDIT_ENABLED='0')
+    os.chdir(ROOT)
+
+    import api
+    evaluator = api.shadow_evaluator
+    client = api.app.test_client()
+    think = args.think_ms / 1000
+
+    # Warm-up supaya konfigurasi pertama tidak dirugikan
+    api.shadow_evaluator = None
+    measure(client, 50, think)
+
+    configs = [("no candidate", None, None)]
+    configs.append((f"shadow {evaluator.sample_percent:g}%", 'shadow', 0))
+    configs.append(("canary 10%", 'canary', 10))
+    p99 = {name: [] for name, _, _ in configs}
+    p50 = {name: [] for name, _, _ in configs}
+    for _ in range(args.rounds):
+        for name, mode, pct in configs:
+            api.shadow_evaluator = None
+            if mode:
+                evaluator.mode, evaluator.canary_percent = mode, pct
+                api.shadow_evaluator = evaluator
+            lat = measure(client, args.requests, think)
+            p50[name].append(np.percentile(lat, 50))
+            p99[name].append(np.percentile(lat, 99))
+    for name, _, _ in configs:
+        print(f"{name:>13}: p50={np.median(p50[name]):6.2f} ms p99={np.median(p99[name]):6.2f} ms "
+              f"(p99 per round {min(p99[name]):.2f}-{max(p99[name]):.2f} ms)")
+
+    while evaluator.summary()["pending"]:
+        time.sleep(0.1)
+    print(evaluator.summary())
+    if tmp:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Helper bersama untuk script benchmark.
+
+Benchmark memakai model.pkl asli kalau tersedia. Kalau tidak (misalnya
+file masih berupa LFS pointer), dibuat Random Forest sintetis dengan
+distribusi mirip dataset diamonds supaya angka overhead tetap bisa diukur.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+CUTS = ['Fair', 'Good', 'Very Good', 'Premium', 'Ideal']
+COLORS = ['J', 'I', 'H', 'G', 'F', 'E', 'D']
+CLARITIES = ['I1', 'SI2', 'SI1', 'VS2', 'VS1', 'VVS2', 'VVS1', 'IF']
+
+# Proporsi kira-kira dari dataset diamonds klasik
+CUT_P = [0.03, 0.09, 0.22, 0.26, 0.40]
+COLOR_P = [0.05, 0.10, 0.15, 0.21, 0.18, 0.18, 0.13]
+CLARITY_P = [0.01, 0.17, 0.24, 0.23, 0.15, 0.09, 0.07, 0.04]
+
+
+def synthetic_diamonds(n, seed=0):
+    """Generate n baris data diamond sintetis (termasuk kolom price)"""
+    rng = np.random.default_rng(seed)
+    carat = np.clip(rng.lognormal(-0.45, 0.55, n), 0.2, 5.0).round(2)
+    cut = rng.choice(len(CUTS), n, p=CUT_P)
+    color = rng.choice(len(COLORS), n, p=COLOR_P)
+    clarity = rng.choice(len(CLARITIES), n, p=CLARITY_P)
+    table = np.clip(rng.normal(57.5, 2.2, n), 43.0, 95.0).round(1)
+    log_price = (8.45 + 1.75 * np.log(carat) + 0.04 * cut + 0.08 * color
+                 + 0.11 * clarity - 0.005 * (table - 57.0)
+                 + rng.normal(0, 0.12, n))
+    return pd.DataFrame({
+        'carat': carat,
+        'cut': np.array(CUTS, dtype=object)[cut],
+        'color': np.array(COLORS, dtype=object)[color],
+        'clarity': np.array(CLARITIES, dtype=object)[clarity],
+        'table': table,
+        'price': np.exp(log_price).round(0),
+    })
+
+
+def encode_frame(df, encoder, features):
+    """Encode kolom kategorikal dan urutkan sesuai features"""
+    out = df[['carat', 'cut', 'color', 'clarity', 'table']].copy()
+    out[['cut', 'color', 'clarity']] = encoder.transform(df[['cut', 'color', 'clarity']].values)
+    return out[features]
+
+
+def train_synthetic_model(n_rows=43000, seed=42):
+    """Latih Random Forest sintetis dengan setting yang sama dengan training asli"""
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import OrdinalEncoder
+
+    df = synthetic_diamonds(n_rows, seed=seed)
+    encoder = OrdinalEncoder(categories=[CUTS, COLORS, CLARITIES])
+    encoder.fit(df[['cut', 'color', 'clarity']].values)
+    features = ['carat', 'cut', 'color', 'clarity', 'table']
+    X = encode_frame(df, encoder, features)
+    model = RandomForestRegressor(n_estimators=100, random_state=seed)
+    model.fit(X, np.log(df['price']))
+    return model, encoder, features
+
+
+def load_or_train():
+    """Load artefak asli dari root repo, atau latih model sintetis"""
+    import joblib
+
+    model_path = os.path.join(ROOT, 'model.pkl')
+    real = False
+    if os.path.exists(model_path):
+        with open(model_path, 'rb') as f:
+            real = not f.read(20).startswith(b'version https://git')
+    if real:
+        model = joblib.load(model_path)
+        encoder = joblib.load(os.path.join(ROOT, 'encoder.pkl'))
+        features = joblib.load(os.path.join(ROOT, 'features.pkl'))
+        print("Using model.pkl")
+    else:
+        print("model.pkl not available, training synthetic forest...")
+        model, encoder, features = train_synthetic_model()
+    return model, encoder, features
+
+
+def timeit(fn, repeat=5, number=1):
+    """Return waktu terbaik (detik) per panggilan dari beberapa ulangan"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
@@ -0,0 +1,142 @@
+"""
+Load test konfigurasi gunicorn.
+
+Menjalankan API dengan beberapa konfigurasi gunicorn di mesin yang sama,
+lalu mengukur waktu startup, total memory (PSS master + worker),
+throughput, dan latency /predict dengan beberapa client bersamaan.
+
+Usage:
+    python benchmarks/loadtest_gunicorn.py [--duration 15] [--clients 8]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import requests
+
+from common import ROOT
+
+PORT = 5088
+DIAMOND = {"carat": 0.9, "cut": "Ideal", "color": "G", "clarity": "VS2", "table": 57.0}
+
+
+def configs(empty_conf):
+    """(nama, argumen gunicorn, env tambahan)"""
+    return [
+        ("default (1 sync, no preload)", ['-c', empty_conf], {}),
+        ("2 sync, no preload", ['-c', empty_conf, '-w', '2'], {}),
+        ("profile", [], {}),
+        ("profile, 2x workers", [], {"WEB_CONCURRENCY": str(2 * len(os.sched_getaffinity(0)))}),
+    ]
+
+
+def process_tree(pid):
+    """PID master beserta semua child-nya"""
+    pids = [pid]
+    out = subprocess.run(['pgrep', '-P', str(pid)], capture_output=True, text=True).stdout
+    for child in out.split():
+        pids.extend(process_tree(int(child)))
+    return pids
+
+
+def pss_mb(pid):
+    """Total PSS (memory shared dibagi rata) dari process tree, dalam MB"""
+    total = 0
+    for p in process_tree(pid):
+        try:
+            with open(f'/proc/{p}/smaps_rollup') as f:
+                for line in f:
+                    if line.startswith('Pss:'):
+                        total += int(line.split()[1])
+        except OSError:
+            pass
+    return total / 1024
+
+
+def wait_ready(url, workers_expected, proc, timeout=300):
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            if requests.get(f"{url}/health", timeout=1).ok:
+                # Tunggu semua worker selesai boot (tanpa preload tiap worker load model)
+                if len(process_tree(proc.pid)) - 1 >= workers_expected:
+                    return time.perf_counter() - start
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("gunicorn did not start")
+
+
+def client(url, stop, latencies, errors):
+    session = requests.Session()
+    while not stop.is_set():
+        start = time.perf_counter()
+        r = session.post(f"{url}/predict", json=DIAMOND)
+        if r.ok:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(r.status_code)
+
+
+def run(name, gunicorn_args, env, args):
+    url = f"http://127.0.0.1:{PORT}"
+    env = {**os.environ, "PORT": str(PORT), "RATE_LIMIT_ENABLED": "0", "AUDIT_ENABLED": "0",
+           "MAX_INFLIGHT": "0", "PYTHONWARNINGS": "ignore", **env}
+    cmd = [sys.executable, '-m', 'gunicorn', 'api:app', '--bind', f"127.0.0.1:{PORT}"] + gunicorn_args
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        workers = 1
+        if '-w' in gunicorn_args:
+            workers = int(gunicorn_args[gunicorn_args.index('-w') + 1])
+        elif not gunicorn_args:
+            workers = int(env.get('WEB_CONCURRENCY', len(os.sched_getaffinity(0))))
+        startup = wait_ready(url, workers, proc)
+
+        stop = threading.Event()
+        latencies, errors = [], []
+        threads = [threading.Thread(target=client, args=(url, stop, latencies, errors))
+                   for _ in range(args.clients)]
+        for t in threads:
+            t.start()
+        time.sleep(args.duration)
+        stop.set()
+        for t in threads:
+            t.join()
+        memory = pss_mb(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    lat = np.array(latencies) * 1e3
+    print(f"| {name} | {startup:.1f} | {memory:,.0f} | {len(lat) / args.duration:.1f} | "
+          f"{np.percentile(lat, 50):.1f} | {np.percentile(lat, 99):.1f} | {len(errors)} |")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--clients', type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile('w', suffix='.py', delete=False) as f:
+        empty_conf = f.name
+    try:
+        print(f"CPUs: {len(os.sched_getaffinity(0))}, clients: {args.clients}, "
+              f"duration: {args.duration:.0f} s\n")
+        print("| Config | Startup (s) | PSS (MB) | Req/s | p50 (ms) | p99 (ms) | Errors |")
+        print("|--------|-------------|----------|-------|----------|----------|--------|")
+        for name, gunicorn_args, env in configs(empty_conf):
+            run(name, gunicorn_args, env, args)
+    finally:
+        os.unlink(empty_conf)
+
+
+if __name__ == '__main__':
+    main()
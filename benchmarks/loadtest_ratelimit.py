@@ -0,0 +1,124 @@
+"""
+Load test rate limiting dan admission control.
+
+Satu bulk client (beberapa thread, batch besar, API key "bulk") membanjiri
+/predict/batch, sementara satu client interaktif mengirim /predict secara
+berkala. Dijalankan dua kali: tanpa limit dan dengan limit, lalu latency
+client interaktif dibandingkan.
+
+Usage:
+    python benchmarks/loadtest_ratelimit.py [--duration 20]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import requests
+
+from common import ROOT
+
+PORT = 5077
+DIAMOND = {"carat": 0.9, "cut": "Ideal", "color": "G", "clarity": "VS2", "table": 57.0}
+
+CONFIGS = {
+    "no limit": {"RATE_LIMIT_ENABLED": "0", "MAX_INFLIGHT": "0"},
+    "limited": {"RATE_LIMIT_ENABLED": "1", "RATE_LIMIT_RATE": "5", "RATE_LIMIT_BURST": "10",
+                "MAX_INFLIGHT": "4", "INFLIGHT_TIMEOUT": "0.05"},
+}
+
+
+def serve(port):
+    """Jalankan API dengan server threaded (dipanggil di subprocess)"""
+    from werkzeug.serving import make_server
+    import api
+    make_server('127.0.0.1', port, api.app, threaded=True).serve_forever()
+
+
+def wait_ready(url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{url}/health", timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("API did not start")
+
+
+def bulk_client(url, stop, statuses, batch_size):
+    session = requests.Session()
+    body = {"diamonds": [DIAMOND] * batch_size}
+    while not stop.is_set():
+        r = session.post(f"{url}/predict/batch", json=body, headers={"X-API-Key": "bulk"})
+        statuses[r.status_code] += 1
+        if r.status_code in (429, 503):
+            # Client yang sopan menunggu sebentar, tapi tidak selama Retry-After
+            time.sleep(0.05)
+
+
+def interactive_client(url, stop, latencies, statuses, interval):
+    session = requests.Session()
+    while not stop.is_set():
+        start = time.perf_counter()
+        r = session.post(f"{url}/predict", json=DIAMOND, headers={"X-API-Key": "streamlit"})
+        latencies.append(time.perf_counter() - start)
+        statuses[r.status_code] += 1
+        time.sleep(interval)
+
+
+def run(name, env, args):
+    url = f"http://127.0.0.1:{PORT}"
+    proc = subprocess.Popen(
+        [sys.executable, __file__, '--serve'],
+        cwd=ROOT, env={**os.environ, **env, "PYTHONWARNINGS": "ignore"},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(url)
+        stop = threading.Event()
+        bulk_statuses, inter_statuses = Counter(), Counter()
+        latencies = []
+        threads = [threading.Thread(target=bulk_client, args=(url, stop, bulk_statuses, args.batch))
+                   for _ in range(args.bulk_threads)]
+        threads.append(threading.Thread(target=interactive_client,
+                                        args=(url, stop, latencies, inter_statuses, 0.2)))
+        for t in threads:
+            t.start()
+        time.sleep(args.duration)
+        stop.set()
+        for t in threads:
+            t.join()
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    lat = np.array(latencies) * 1e3
+    print(f"{name:>9}: interactive p50={np.percentile(lat, 50):7.1f} ms "
+          f"p99={np.percentile(lat, 99):7.1f} ms n={len(lat)} {dict(inter_statuses)} | "
+          f"bulk {dict(bulk_statuses)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--serve', action='store_true')
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--bulk-threads', type=int, default=4)
+    parser.add_argument('--batch', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(PORT)
+        return
+    for name, env in CONFIGS.items():
+        run(name, env, args)
+
+
+if __name__ == '__main__':
+    main()
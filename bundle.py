@@ -0,0 +1,92 @@
+"""
+Diamond Price Prediction - Model Bundle
+Satu set artefak model (model, encoder, features) beserta versinya.
+"""
+
+import hashlib
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from intervals import ForestLeafTable
+from validation import VALID_CUTS, VALID_COLORS, VALID_CLARITIES
+
+
+def file_sha256(path):
+    """SHA-256 hex digest dari isi file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def category_codes(encoder):
+    """Lookup index kategori (urutan VALID_*) -> kode encoder per fitur"""
+    options = {'cut': VALID_CUTS, 'color': VALID_COLORS, 'clarity': VALID_CLARITIES}
+    n = max(len(values) for values in options.values())
+    # Satu baris per index, kolom yang lebih pendek diisi nilai pertama
+    rows = [[values[i] if i < len(values) else values[0] for values in options.values()]
+            for i in range(n)]
+    encoded = encoder.transform(rows)
+    return {name: encoded[:len(values), j] for j, (name, values) in enumerate(options.items())}
+
+
+class ModelBundle:
+    """Model, encoder, dan urutan features yang dipakai bersama"""
+
+    def __init__(self, model, encoder, features, version):
+        self.model = model
+        self.encoder = encoder
+        self.features = features
+        self.version = version
+        # Manifest artefak (diisi oleh artifact.load_artifact)
+        self.manifest = None
+        # Tabel leaf untuk prediction interval (dibangun sekali)
+        self.leaf_table = ForestLeafTable(model)
+        # Lookup encoding untuk input kolom (hasil validasi vectorized)
+        self.category_codes = category_codes(encoder)
+
+    def encode_columns(self, values):
+        """
+        Buat input DataFrame model dari hasil validasi vectorized
+        (BatchResult.values: index kategori sesuai urutan VALID_*).
+        """
+        n_rows = len(values['carat'])
+        # Satu blok float32 C-order (format yang dipakai tree sklearn), tanpa copy lagi
+        X = np.empty((n_rows, len(self.features)), dtype=np.float32)
+        for j, name in enumerate(self.features):
+            codes = self.category_codes.get(name)
+            X[:, j] = codes[values[name]] if codes is not None else values[name]
+        return pd.DataFrame(X, columns=self.features, copy=False)
+
+    def predict_log(self, input_data, quantiles=None):
+        """
+        Prediksi log price.
+
+        Returns:
+            (log_prices, log_q) - log_q None jika quantiles kosong
+        """
+        if quantiles:
+            # Point estimate dan kuantil dari satu traversal per-tree
+            return self.leaf_table.predict(input_data, quantiles)
+        return self.model.predict(input_data), None
+
+
+def load_bundle(directory, version=None):
+    """
+    Load model dari satu folder: artefak model.bundle jika ada (lewat warm
+    cache MODEL_CACHE_DIR), atau model.pkl, encoder.pkl, dan features.pkl
+    """
+    artifact_path = os.path.join(directory, 'model.bundle')
+    if os.path.exists(artifact_path):
+        from artifact import load_artifact
+        return load_artifact(artifact_path, os.environ.get('MODEL_CACHE_DIR', '.cache'),
+                             version=version)
+    model_path = os.path.join(directory, 'model.pkl')
+    model = joblib.load(model_path)
+    encoder = joblib.load(os.path.join(directory, 'encoder.pkl'))
+    features = joblib.load(os.path.join(directory, 'features.pkl'))
+    return ModelBundle(model, encoder, features, version or file_sha256(model_path)[:12])
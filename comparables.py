@@ -0,0 +1,144 @@
+"""
+Diamond Price Prediction - Comparable Diamonds
+Pencarian diamond paling mirip dari dataset referensi (KD-tree).
+
+Jarak dihitung di ruang fitur:
+- carat dan table di-scale dengan standar deviasi referensi
+- cut, color, clarity berupa index grade (urutan VALID_*) dikali bobot,
+  jadi beda satu grade setara `weight` standar deviasi carat/table
+
+Mode `exact=True` hanya mencari di grup cut/color/clarity yang sama
+(satu KD-tree per grup, dimensi carat dan table).
+
+Index dibangun dari REFERENCE_DATA (CSV dengan kolom carat, cut, color,
+clarity, table, price) dan disimpan ke disk, dengan nama file berisi hash
+dataset, sehingga startup berikutnya cukup load index.
+"""
+
+import os
+
+import joblib
+import numpy as np
+from sklearn.neighbors import KDTree
+
+from bundle import file_sha256
+from validation import VALID_CUTS, VALID_COLORS, VALID_CLARITIES, validator
+
+CATEGORICAL = {'cut': VALID_CUTS, 'color': VALID_COLORS, 'clarity': VALID_CLARITIES}
+DEFAULT_WEIGHTS = {'cut': 0.3, 'color': 0.5, 'clarity': 0.5}
+
+INDEX_VERSION = 1
+
+
+class ComparablesIndex:
+    """KD-tree atas dataset referensi untuk query k-nearest diamonds"""
+
+    def __init__(self, df, weights=None, leaf_size=40):
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        result = validator.validate_columns({c: df[c].to_numpy() for c in validator.fields})
+        if not result.all_valid:
+            # Baris referensi yang tidak valid diabaikan
+            df = df[result.valid]
+            result = validator.validate_columns({c: df[c].to_numpy() for c in validator.fields})
+
+        # Simpan referensi sebagai array ringkas (bukan DataFrame)
+        self.carat = result.values['carat'].astype(np.float32)
+        self.table = result.values['table'].astype(np.float32)
+        self.codes = {name: result.values[name].astype(np.int8) for name in CATEGORICAL}
+        self.price = df['price'].to_numpy(dtype=np.float32)
+        self.size = len(self.price)
+
+        self.carat_scale = float(self.carat.std()) or 1.0
+        self.table_scale = float(self.table.std()) or 1.0
+        self.tree = KDTree(self._points(self.carat, self.table, self.codes), leaf_size=leaf_size)
+
+        # Satu KD-tree per kombinasi cut/color/clarity untuk mode exact
+        group = self._group_key(self.codes)
+        order = np.argsort(group, kind='stable')
+        keys, starts = np.unique(group[order], return_index=True)
+        bounds = np.append(starts, len(order))
+        self.groups = {}
+        for key, start, end in zip(keys.tolist(), bounds[:-1], bounds[1:]):
+            rows = order[start:end]
+            points = np.column_stack([self.carat[rows] / self.carat_scale,
+                                      self.table[rows] / self.table_scale])
+            self.groups[key] = (KDTree(points, leaf_size=leaf_size), rows)
+
+    def _points(self, carat, table, codes):
+        columns = [carat / self.carat_scale, table / self.table_scale]
+        columns += [codes[name] * self.weights[name] for name in CATEGORICAL]
+        return np.column_stack(columns).astype(np.float64)
+
+    @staticmethod
+    def _group_key(codes):
+        return (codes['cut'].astype(np.int32) * len(VALID_COLORS) + codes['color']) \
+            * len(VALID_CLARITIES) + codes['clarity']
+
+    def query(self, diamond, k=5, exact=False):
+        """
+        Cari k diamond paling mirip.
+
+        Args:
+            diamond: dict yang sudah divalidasi (carat, cut, color, clarity, table)
+            exact: hanya diamond dengan cut/color/clarity yang sama
+
+        Returns:
+            list dict diamond referensi + price_usd + distance, urut dari terdekat
+        """
+        codes = {name: np.array([values.index(diamond[name])]) for name, values in CATEGORICAL.items()}
+        if exact:
+            entry = self.groups.get(int(self._group_key(codes)[0]))
+            if entry is None:
+                return []
+            tree, rows = entry
+            point = [[diamond['carat'] / self.carat_scale, diamond['table'] / self.table_scale]]
+            dist, idx = tree.query(point, k=min(k, len(rows)))
+            idx = rows[idx[0]]
+        else:
+            point = self._points(np.array([diamond['carat']]), np.array([diamond['table']]), codes)
+            dist, idx = self.tree.query(point, k=min(k, self.size))
+            idx = idx[0]
+        return [
+            {
+                "carat": round(float(self.carat[i]), 2),
+                "cut": VALID_CUTS[self.codes['cut'][i]],
+                "color": VALID_COLORS[self.codes['color'][i]],
+                "clarity": VALID_CLARITIES[self.codes['clarity'][i]],
+                "table": round(float(self.table[i]), 1),
+                "price_usd": round(float(self.price[i]), 2),
+                "distance": round(float(d), 4)
+            }
+            for i, d in zip(idx.tolist(), dist[0].tolist())
+        ]
+
+
+def read_reference(path):
+    """Baca dataset referensi (CSV atau Parquet)"""
+    import pandas as pd
+    columns = list(validator.fields) + ['price']
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def load_index(reference_path, cache_dir='.cache', weights=None):
+    """
+    Load index dari cache disk, atau build dari dataset referensi lalu simpan.
+    Nama file cache berisi hash dataset, jadi dataset baru otomatis rebuild.
+    """
+    digest = file_sha256(reference_path)[:16]
+    cache_path = os.path.join(cache_dir, f"comparables-v{INDEX_VERSION}-{digest}.joblib")
+    if os.path.exists(cache_path):
+        try:
+            index = joblib.load(cache_path)
+            if weights is None or index.weights == dict(DEFAULT_WEIGHTS, **weights):
+                return index
+        except Exception as e:
+            print(f"⚠️ Comparables cache unreadable, rebuilding: {e}")
+
+    index = ComparablesIndex(read_reference(reference_path), weights=weights)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    joblib.dump(index, tmp_path)
+    os.replace(tmp_path, cache_path)
+    return index
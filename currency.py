@@ -0,0 +1,177 @@
+"""
+Diamond Price Prediction - Currency Conversion
+Tabel kurs in-memory untuk konversi harga USD ke berbagai mata uang.
+
+Kurs di-load dari file lokal (rates.json) atau provider lain yang
+pluggable, lalu di-refresh di background thread berdasarkan TTL.
+Request path hanya membaca snapshot kurs yang sudah ada di memory,
+tidak pernah melakukan fetch.
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from forksafe import ProcessOwner
+
+# Kurs default jika file/provider tidak tersedia (per 1 USD)
+DEFAULT_RATES = {"USD": 1.0, "IDR": 15500.0}
+
+# Mata uang yang wajib ada di setiap snapshot (IDR selalu ada di response)
+REQUIRED_CURRENCIES = tuple(DEFAULT_RATES)
+
+# Mata uang tanpa desimal
+ZERO_DECIMAL_CURRENCIES = {"IDR", "JPY", "KRW", "VND"}
+
+RATES_PATH = os.environ.get(
+    'RATES_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rates.json')
+)
+RATES_TTL = float(os.environ.get('RATES_TTL', 3600))
+
+
+class StaticRateProvider:
+    """Provider kurs statis (untuk test atau fallback)"""
+
+    def __init__(self, rates):
+        self.rates = dict(rates)
+
+    def fetch(self):
+        return dict(self.rates)
+
+
+class FileRateProvider:
+    """
+    Provider kurs dari file JSON lokal.
+
+    Format file:
+    {"base": "USD", "rates": {"IDR": 15500, "EUR": 0.92, ...}}
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self):
+        with open(self.path) as f:
+            data = json.load(f)
+        if data.get('base', 'USD') != 'USD':
+            raise ValueError(f"Rates file {self.path} must use USD as base")
+        return data['rates']
+
+
+class _Snapshot:
+    """Snapshot kurs immutable, diganti secara atomik saat refresh"""
+
+    def __init__(self, rates):
+        rates = {code.upper(): float(rate) for code, rate in rates.items()}
+        rates['USD'] = 1.0
+        for code, rate in rates.items():
+            if not (rate > 0 and np.isfinite(rate)):
+                raise ValueError(f"Invalid rate for {code}: {rate}")
+        missing = [code for code in REQUIRED_CURRENCIES if code not in rates]
+        if missing:
+            raise ValueError(f"Missing required rates: {', '.join(missing)}")
+        self.codes = tuple(sorted(rates))
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.rates = np.array([rates[code] for code in self.codes])
+        self.updated_at = time.time()
+
+
+class RateTable:
+    """
+    Tabel kurs in-memory dengan refresh background berbasis TTL.
+
+    Provider adalah object apa saja dengan method fetch() yang
+    mengembalikan dict {kode_mata_uang: kurs_per_USD}.
+    """
+
+    def __init__(self, provider, ttl=RATES_TTL):
+        self.provider = provider
+        self.ttl = ttl
+        self.last_error = None
+        self._snapshot = _Snapshot(DEFAULT_RATES)
+        self._stop = threading.Event()
+        self._thread = None
+        self._owner = ProcessOwner()
+        self.refresh()
+
+    def refresh(self):
+        """Fetch kurs dari provider. Jika gagal, snapshot lama tetap dipakai."""
+        try:
+            self._snapshot = _Snapshot(self.provider.fetch())
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"⚠️ Failed to refresh exchange rates: {e}")
+            return False
+
+    def start(self):
+        """Start background refresh thread (idempotent, aman setelah fork)"""
+        if self._thread is not None and self._thread.is_alive() and self._owner.owned():
+            return
+        if self.ttl <= 0:
+            return
+        if self._owner.claim():
+            # Proses hasil fork: Event parent bisa ter-copy dalam keadaan terkunci
+            self._stop = threading.Event()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rate-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.ttl):
+            self.refresh()
+
+    @property
+    def currencies(self):
+        return self._snapshot.codes
+
+    @property
+    def updated_at(self):
+        return self._snapshot.updated_at
+
+    def rate(self, currency):
+        """Kurs 1 USD dalam mata uang tertentu"""
+        snapshot = self._snapshot
+        try:
+            return float(snapshot.rates[snapshot.index[currency.upper()]])
+        except KeyError:
+            raise ValueError(f"Unsupported currency: {currency}")
+
+    def convert(self, prices_usd, currencies):
+        """
+        Konversi array harga USD ke beberapa mata uang sekaligus.
+
+        Returns:
+            dict {kode: array harga}, dihitung dalam satu outer product
+        """
+        snapshot = self._snapshot
+        codes = [c.upper() for c in currencies]
+        unknown = [c for c in codes if c not in snapshot.index]
+        if unknown:
+            raise ValueError(f"Unsupported currency: {', '.join(unknown)}")
+        rates = snapshot.rates[[snapshot.index[c] for c in codes]]
+        converted = np.multiply.outer(rates, np.asarray(prices_usd, dtype=float))
+        return dict(zip(codes, converted))
+
+
+def round_price(value, currency):
+    """Bulatkan harga sesuai jumlah desimal mata uang"""
+    return round(float(value), 0 if currency in ZERO_DECIMAL_CURRENCIES else 2)
+
+
+def load_rate_table(path=RATES_PATH, ttl=RATES_TTL):
+    """Buat RateTable dari file kurs, fallback ke kurs default"""
+    if os.path.exists(path):
+        provider = FileRateProvider(path)
+    else:
+        print(f"⚠️ Rates file {path} not found, using default rates")
+        provider = StaticRateProvider(DEFAULT_RATES)
+    return RateTable(provider, ttl=ttl)
@@ -0,0 +1,434 @@
+"""
+Diamond Price Prediction - Drift Monitor
+Monitoring distribusi input model secara online.
+
+Setiap request /predict meng-update sketch berukuran tetap:
+- fitur numerik: histogram dengan bin edges tetap
+- fitur kategorikal: counter per kategori (+ "other")
+
+Distribusi traffic dibandingkan dengan baseline snapshot dari data
+training menggunakan PSI (Population Stability Index) dan KS statistic
+(dihitung dari CDF histogram).
+
+Dengan SQLiteSketchStore, counter setiap proses di-flush secara berkala
+ke file SQLite bersama, jadi semua worker gunicorn di satu host
+melaporkan distribusi yang sama. Counter di store disimpan per jam dan
+laporan hanya memakai `window_hours` jam terakhir, jadi traffic lama
+tidak menutupi drift yang baru terjadi.
+
+Membuat baseline dari data training:
+    python drift.py baseline train.csv -o drift_baseline.json
+"""
+
+import argparse
+import bisect
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from forksafe import ProcessOwner, SQLiteConnections
+from validation import VALID_CUTS, VALID_COLORS, VALID_CLARITIES
+
+# Bin edges tetap (memory konstan), mengikuti range validasi API
+NUMERIC_BINS = {
+    'carat': [0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0, 1.1, 1.25, 1.5,
+              1.75, 2.0, 2.5, 3.0, 4.0, 5.0],
+    'table': [43.0, 53.0, 54.0, 55.0, 56.0, 57.0, 58.0, 59.0, 60.0, 61.0,
+              62.0, 63.0, 65.0, 95.0],
+}
+
+CATEGORICAL_VALUES = {
+    'cut': VALID_CUTS,
+    'color': VALID_COLORS,
+    'clarity': VALID_CLARITIES,
+}
+
+# Threshold PSI yang umum dipakai
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+# Smoothing supaya bin kosong tidak menghasilkan log(0)
+EPSILON = 1e-4
+
+# Ukuran bucket waktu counter di store
+BUCKET_SECONDS = 3600
+
+
+class SQLiteSketchStore:
+    """
+    Counter sketch di file SQLite, dibagi antar proses.
+
+    Setiap baris berisi (bucket, feature, bin, count), bucket = jam sejak
+    epoch. Jika layout di file beda dengan monitor (bin edges diubah atau
+    versi model lain), counter lama dihapus.
+
+    Args:
+        window_hours: jumlah bucket yang dibaca load() dan disimpan;
+            bucket yang lebih lama dihapus saat add(). 0 = tanpa window.
+    """
+
+    def __init__(self, path, window_hours=24):
+        self.path = path
+        self.window_hours = window_hours
+        self._connections = SQLiteConnections(path, setup=[
+            "CREATE TABLE IF NOT EXISTS bucket_counts "
+            "(bucket INTEGER NOT NULL, feature TEXT NOT NULL, bin INTEGER NOT NULL, "
+            "count INTEGER NOT NULL, PRIMARY KEY (bucket, feature, bin))",
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+        ])
+
+    def _first_bucket(self, bucket):
+        """Bucket tertua yang masih masuk window"""
+        return bucket - self.window_hours + 1 if self.window_hours > 0 else 0
+
+    def open(self, layout):
+        """Pastikan layout bin di file sama dengan monitor"""
+        conn = self._connections.get()
+        layout = json.dumps(layout, sort_keys=True)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+            if row is None or row[0] != layout:
+                # Tabel `counts` lama (tanpa bucket) tidak dipakai lagi
+                conn.execute("DROP TABLE IF EXISTS counts")
+                conn.execute("DELETE FROM bucket_counts")
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('layout', ?)", (layout,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def add(self, deltas, bucket):
+        """Tambahkan dict feature -> array counter ke bucket dalam satu transaksi"""
+        rows = [(bucket, name, b, int(c)) for name, counts in deltas.items()
+                for b, c in enumerate(np.asarray(counts).tolist()) if c]
+        if not rows:
+            return
+        conn = self._connections.get()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO bucket_counts (bucket, feature, bin, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (bucket, feature, bin) DO UPDATE SET count = count + excluded.count",
+                rows
+            )
+            conn.execute("DELETE FROM bucket_counts WHERE bucket < ?", (self._first_bucket(bucket),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def load(self, sizes, bucket):
+        """
+        Returns (dict feature -> array counter, bucket tertua yang berisi
+        data atau None) untuk window yang berakhir di `bucket`.
+        """
+        totals = {name: np.zeros(size, dtype=np.int64) for name, size in sizes.items()}
+        conn = self._connections.get()
+        first = self._first_bucket(bucket)
+        rows = conn.execute(
+            "SELECT feature, bin, SUM(count) FROM bucket_counts WHERE bucket >= ? "
+            "GROUP BY feature, bin", (first,)
+        )
+        for name, b, count in rows:
+            if name in totals and b < len(totals[name]):
+                totals[name][b] = count
+        oldest = conn.execute("SELECT MIN(bucket) FROM bucket_counts WHERE bucket >= ?", (first,)).fetchone()[0]
+        return totals, oldest
+
+    def clear(self):
+        """Hapus semua counter"""
+        self._connections.get().execute("DELETE FROM bucket_counts")
+
+
+class DriftMonitor:
+    """
+    Sketch distribusi input dengan memory konstan.
+
+    Args:
+        store: optional SQLiteSketchStore. Jika diset, counter lokal
+            di-flush ke store setiap `flush_interval` detik (thread dari
+            start()) dan saat snapshot(), dan snapshot() membaca total dari
+            store (semua proses, window_hours jam terakhir).
+        version: versi model; counter di store dihapus jika versi berubah
+    """
+
+    def __init__(self, numeric_bins=NUMERIC_BINS, categorical_values=CATEGORICAL_VALUES,
+                 store=None, flush_interval=5.0, version=None):
+        self.numeric_bins = {name: list(edges) for name, edges in numeric_bins.items()}
+        self.categorical_values = {name: list(values) for name, values in categorical_values.items()}
+        self._category_index = {
+            name: {value: i for i, value in enumerate(values)}
+            for name, values in self.categorical_values.items()
+        }
+        self.store = store
+        self.flush_interval = flush_interval
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._owner = ProcessOwner()
+        self.started = time.time()
+        self.reset()
+        if store is not None:
+            store.open({"numeric": self.numeric_bins, "categorical": self.categorical_values,
+                        "bucket_seconds": BUCKET_SECONDS, "version": version})
+
+    def reset(self):
+        """Kosongkan counter lokal (counter di store tidak dihapus)"""
+        with self._lock:
+            self._reset_counts()
+
+    def clear(self):
+        """
+        Mulai statistik dari nol: counter lokal dan store. Counter worker
+        lain yang belum di-flush (maksimal flush_interval) tetap masuk.
+        """
+        with self._lock:
+            self._reset_counts()
+            self.started = time.time()
+        if self.store is not None:
+            self.store.clear()
+
+    def _reset_counts(self):
+        self.count = 0
+        # len(edges) - 1 bin, ditambah satu bin untuk nilai di luar edges
+        self.numeric_counts = {
+            name: np.zeros(len(edges), dtype=np.int64)
+            for name, edges in self.numeric_bins.items()
+        }
+        self.categorical_counts = {
+            name: np.zeros(len(values) + 1, dtype=np.int64)
+            for name, values in self.categorical_values.items()
+        }
+
+    def _numeric_bin(self, name, value):
+        edges = self.numeric_bins[name]
+        if not (edges[0] <= value <= edges[-1]):
+            return len(edges) - 1
+        return min(bisect.bisect_right(edges, value) - 1, len(edges) - 2)
+
+    def update(self, diamonds):
+        """Update sketch dengan list input diamond (dict)"""
+        if len(diamonds) == 1:
+            # Jalur scalar: O(log bins) per fitur, tanpa alokasi array
+            diamond = diamonds[0]
+            numeric = {name: self._numeric_bin(name, diamond[name]) for name in self.numeric_bins}
+            categorical = {
+                name: index.get(diamond[name], len(index))
+                for name, index in self._category_index.items()
+            }
+            with self._lock:
+                self.count += 1
+                for name, b in numeric.items():
+                    self.numeric_counts[name][b] += 1
+                for name, b in categorical.items():
+                    self.categorical_counts[name][b] += 1
+            return
+
+        numeric = {}
+        for name, edges in self.numeric_bins.items():
+            values = np.fromiter((d[name] for d in diamonds), dtype=float, count=len(diamonds))
+            numeric[name] = histogram(values, edges)
+        categorical = {}
+        for name, index in self._category_index.items():
+            codes = [index.get(d[name], len(index)) for d in diamonds]
+            categorical[name] = np.bincount(codes, minlength=len(index) + 1)
+        with self._lock:
+            self.count += len(diamonds)
+            for name, counts in numeric.items():
+                self.numeric_counts[name] += counts
+            for name, counts in categorical.items():
+                self.categorical_counts[name] += counts
+
+    def start(self):
+        """Start thread flush ke store (idempotent, aman setelah fork)"""
+        if self.store is None or self.flush_interval <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive() and self._owner.owned():
+            return
+        if self._owner.claim():
+            # Proses hasil fork: counter lokal milik parent (sudah/akan di-flush parent)
+            self._lock = threading.Lock()
+            self._stop = threading.Event()
+            self.reset()
+        self._thread = threading.Thread(target=self._run, name="drift-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Pindahkan counter lokal ke store. Returns False jika gagal."""
+        if self.store is None:
+            return True
+        with self._lock:
+            deltas = {"count": np.array([self.count]), **self.numeric_counts, **self.categorical_counts}
+            self._reset_counts()
+        try:
+            self.store.add(deltas, int(time.time() // BUCKET_SECONDS))
+            self.last_error = None
+            return True
+        except Exception as e:
+            # Kembalikan ke counter lokal, dicoba lagi di flush berikutnya
+            self.last_error = str(e)
+            with self._lock:
+                self.count += int(deltas.pop("count")[0])
+                for name, counts in deltas.items():
+                    target = self.numeric_counts if name in self.numeric_counts else self.categorical_counts
+                    target[name] += counts
+            return False
+
+    def _counts(self):
+        """
+        (count, numeric_counts, categorical_counts, window) lokal (sejak
+        start/clear proses ini) atau total window dari store
+        """
+        now = time.time()
+        if self.store is None or not self.flush():
+            with self._lock:
+                window = {"hours": None, "start": _isoformat(self.started), "end": _isoformat(now)}
+                return (self.count,
+                        {name: counts.copy() for name, counts in self.numeric_counts.items()},
+                        {name: counts.copy() for name, counts in self.categorical_counts.items()},
+                        window)
+        sizes = {"count": 1}
+        sizes.update({name: len(edges) for name, edges in self.numeric_bins.items()})
+        sizes.update({name: len(values) + 1 for name, values in self.categorical_values.items()})
+        totals, oldest = self.store.load(sizes, int(now // BUCKET_SECONDS))
+        window = {
+            "hours": self.store.window_hours or None,
+            "start": _isoformat(oldest * BUCKET_SECONDS) if oldest is not None else None,
+            "end": _isoformat(now),
+        }
+        return (int(totals.pop("count")[0]),
+                {name: totals[name] for name in self.numeric_bins},
+                {name: totals[name] for name in self.categorical_values},
+                window)
+
+    def snapshot(self):
+        """Salinan state sketch dalam bentuk JSON-serializable"""
+        count, numeric_counts, categorical_counts, window = self._counts()
+        return {
+            "count": int(count),
+            "window": window,
+            "numeric": {
+                name: {"edges": self.numeric_bins[name], "counts": counts.tolist()}
+                for name, counts in numeric_counts.items()
+            },
+            "categorical": {
+                name: {"values": self.categorical_values[name], "counts": counts.tolist()}
+                for name, counts in categorical_counts.items()
+            }
+        }
+
+    def report(self, baseline=None):
+        """
+        Skor drift per fitur terhadap baseline.
+
+        Returns:
+            dict dengan count, window, dan per fitur: psi, ks (numerik), status
+        """
+        current = self.snapshot()
+        result = {"count": current["count"], "window": current["window"],
+                  "baseline_loaded": baseline is not None, "features": {}}
+        for kind in ("numeric", "categorical"):
+            for name, sketch in current[kind].items():
+                counts = np.array(sketch["counts"], dtype=float)
+                feature = {"distribution": distribution(counts)}
+                reference = baseline[kind].get(name) if baseline is not None else None
+                key = "edges" if kind == "numeric" else "values"
+                if reference is not None and reference[key] != sketch[key]:
+                    feature["error"] = "Baseline bins do not match monitor bins"
+                elif reference is not None and current["count"] > 0:
+                    expected = np.array(reference["counts"], dtype=float)
+                    feature["psi"] = round(psi(counts, expected), 4)
+                    if kind == "numeric":
+                        feature["ks"] = round(ks(counts, expected), 4)
+                    feature["status"] = psi_status(feature["psi"])
+                result["features"][name] = feature
+        return result
+
+
+def _isoformat(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='seconds')
+
+
+def histogram(values, edges):
+    """Histogram dengan edges tetap, nilai di luar range masuk bin overflow"""
+    edges = np.asarray(edges)
+    bins = np.searchsorted(edges, values, side='right') - 1
+    bins = np.minimum(bins, len(edges) - 2)
+    bins[(values < edges[0]) | (values > edges[-1]) | np.isnan(values)] = len(edges) - 1
+    return np.bincount(bins, minlength=len(edges))
+
+
+def distribution(counts):
+    total = counts.sum()
+    return (counts / total).round(4).tolist() if total else counts.tolist()
+
+
+def psi(actual, expected):
+    """Population Stability Index antara dua histogram (counts)"""
+    a = actual / max(actual.sum(), 1) + EPSILON
+    e = expected / max(expected.sum(), 1) + EPSILON
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def ks(actual, expected):
+    """KS statistic dari CDF histogram (aproksimasi pada bin edges)"""
+    a = np.cumsum(actual) / max(actual.sum(), 1)
+    e = np.cumsum(expected) / max(expected.sum(), 1)
+    return float(np.max(np.abs(a - e)))
+
+
+def psi_status(value):
+    if value >= PSI_SIGNIFICANT:
+        return "significant"
+    if value >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+
+def build_baseline(df):
+    """Buat baseline snapshot dari DataFrame training (kolom mentah, belum di-encode)"""
+    monitor = DriftMonitor()
+    monitor.update(df[list(NUMERIC_BINS) + list(CATEGORICAL_VALUES)].to_dict('records'))
+    return monitor.snapshot()
+
+
+def load_baseline(path):
+    """Load baseline snapshot, None jika file tidak ada"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Drift monitor utilities")
+    sub = parser.add_subparsers(dest='command', required=True)
+    baseline = sub.add_parser('baseline', help="Buat baseline snapshot dari CSV training")
+    baseline.add_argument('csv')
+    baseline.add_argument('-o', '--output', default='drift_baseline.json')
+    args = parser.parse_args()
+
+    snapshot = build_baseline(pd.read_csv(args.csv))
+    with open(args.output, 'w') as f:
+        json.dump(snapshot, f, indent=2)
+    print(f"✅ Baseline with {snapshot['count']} rows saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Diamond Price Prediction - Fork Safety
+Helper untuk state yang tidak boleh dipakai lintas fork.
+
+Dengan gunicorn --preload, worker di-fork dari master. Thread tidak ikut
+ter-copy, lock bisa ter-copy dalam keadaan terkunci, dan koneksi SQLite
+tidak boleh dipakai oleh dua proses. Komponen dengan thread background
+(kurs, audit, drift, shadow) memakai ProcessOwner untuk mendeteksi fork,
+dan komponen dengan file SQLite (rate limit, drift, jobs) memakai
+SQLiteConnections.
+"""
+
+import os
+import sqlite3
+import threading
+
+
+class ProcessOwner:
+    """PID proses yang memiliki thread/lock sebuah komponen"""
+
+    def __init__(self):
+        self.pid = None
+
+    def owned(self):
+        """True jika state dibuat di proses ini"""
+        return self.pid == os.getpid()
+
+    def claim(self):
+        """
+        Tandai proses ini sebagai pemilik. Returns True jika state berasal
+        dari proses lain (hasil fork) dan lock/buffer harus dibuat ulang.
+        """
+        forked = self.pid is not None and self.pid != os.getpid()
+        self.pid = os.getpid()
+        return forked
+
+
+class SQLiteConnections:
+    """
+    Koneksi SQLite per thread dan per proses (autocommit, WAL).
+
+    Args:
+        setup: list statement yang dijalankan di setiap koneksi baru
+            (CREATE TABLE IF NOT EXISTS ...)
+        synchronous: nilai PRAGMA synchronous
+        row_factory: optional, misal sqlite3.Row
+    """
+
+    def __init__(self, path, timeout=5.0, setup=(), synchronous='NORMAL', row_factory=None):
+        self.path = path
+        self.timeout = timeout
+        self.setup = list(setup)
+        self.synchronous = synchronous
+        self.row_factory = row_factory
+        self._local = threading.local()
+
+    def get(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            for statement in self.setup:
+                conn.execute(statement)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
@@ -0,0 +1,124 @@
+"""
+Diamond Price Prediction - Gunicorn Serving Profile
+Konfigurasi production untuk `gunicorn api:app` (file ini otomatis
+dibaca gunicorn dari working directory).
+
+- Model di-load sekali di master (preload_app), lalu worker di-fork dan
+  berbagi memory model secara copy-on-write.
+- Thread BLAS/OpenMP/joblib dipin ke 1 per worker supaya worker tidak
+  saling berebut core (oversubscription).
+- Jumlah worker mengikuti CPU yang tersedia untuk proses/container,
+  karena prediksi Random Forest CPU-bound. Worker job repricing
+  (JOBS_WORKERS, default 0) mengurangi jumlah worker API.
+- Concurrency gate (MAX_INFLIGHT) lebih kecil dari jumlah thread, dan
+  koneksi per worker serta antrean accept dibatasi, supaya request
+  berlebih langsung dijawab 503 dan tidak mengantre di gunicorn.
+
+Semua nilai bisa di-override via environment variable atau flag CLI.
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+
+# Harus diset sebelum numpy/sklearn di-import (import terjadi saat preload)
+MODEL_THREADS = os.environ.get('MODEL_THREADS', '1')
+for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+             'BLIS_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS'):
+    os.environ.setdefault(name, MODEL_THREADS)
+os.environ.setdefault('MODEL_N_JOBS', MODEL_THREADS)
+
+
+def available_cpus():
+    """Jumlah CPU yang boleh dipakai (affinity dan kuota cgroup container)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = multiprocessing.cpu_count()
+    try:
+        # cgroup v2: "<quota> <period>" atau "max <period>"
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+CPUS = available_cpus()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 7860)}"
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+if preload_app:
+    # Thread background hanya di-start di worker (post_fork), tidak di master
+    os.environ['START_BACKGROUND_ON_IMPORT'] = '0'
+
+# Worker job repricing (`python jobs.py worker`) yang dijalankan profile
+# ini di samping API. Default 0: worker job me-load model sendiri (tidak
+# berbagi memory copy-on-write dengan worker API) dan CPU-bound, jadi
+# sebaiknya dijalankan terpisah (container / host lain dengan JOBS_DB dan
+# JOBS_DIR di volume bersama). Jika diset, setiap worker job memakai satu
+# CPU dari jatah worker API.
+JOBS_WORKERS = int(os.environ.get('JOBS_WORKERS', 0))
+_job_workers = []
+
+workers = int(os.environ.get('WEB_CONCURRENCY', max(1, CPUS - JOBS_WORKERS)))
+if JOBS_WORKERS and workers + JOBS_WORKERS > CPUS:
+    print(f"⚠️ {workers} API worker(s) + {JOBS_WORKERS} job worker(s) on {CPUS} CPU(s): "
+          f"job scoring competes with requests, run `jobs.py worker` separately")
+# gthread: beberapa thread per worker supaya I/O request/response overlap
+# dengan prediksi, dan concurrency gate (MAX_INFLIGHT) bisa bekerja
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+# Gate hanya bisa menolak request yang sudah mendapat thread, jadi
+# MAX_INFLIGHT harus lebih kecil dari threads. Thread sisanya menjawab
+# 503 untuk request berlebih (dan /health) tanpa menunggu prediksi.
+os.environ.setdefault('MAX_INFLIGHT', str(max(1, threads // 2)))
+if threads > 1 and not 0 < int(os.environ['MAX_INFLIGHT']) < threads:
+    print(f"⚠️ MAX_INFLIGHT={os.environ['MAX_INFLIGHT']} with {threads} threads per worker: "
+          f"the concurrency gate never sheds load, excess requests queue in gunicorn")
+# Batas koneksi per worker dan antrean accept di socket: koneksi di atas
+# batas ini menunggu di kernel (backlog) lalu ditolak, bukan diantrekan
+# tanpa batas di thread pool gunicorn
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', threads * 4))
+backlog = int(os.environ.get('GUNICORN_BACKLOG', 64))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    """Start worker job repricing setelah master siap"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs.py')
+    for _ in range(JOBS_WORKERS):
+        _job_workers.append(subprocess.Popen([sys.executable, script, 'worker']))
+    if _job_workers:
+        server.log.info("Started %d job worker(s)", len(_job_workers))
+
+
+def on_exit(server):
+    """Stop worker job repricing (job yang berjalan dilanjutkan dari checkpoint)"""
+    for proc in _job_workers:
+        proc.terminate()
+    for proc in _job_workers:
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def post_fork(server, worker):
+    """Thread background tidak ikut fork, start ulang di setiap worker"""
+    if preload_app:
+        import api
+        api.start_background_services()
+
+
+def worker_exit(server, worker):
+    """Flush audit log dan counter drift sebelum worker berhenti"""
+    import api
+    api.drift_monitor.stop()
+    if api.audit_log is not None:
+        api.audit_log.close()
@@ -0,0 +1,103 @@
+"""
+Diamond Price Prediction - Prediction Interval
+Interval/kuantil harga dari distribusi prediksi per-tree Random Forest.
+
+Random Forest regressor memprediksi rata-rata nilai leaf dari semua tree.
+Dengan menyimpan nilai leaf semua tree dalam satu array datar, satu
+traversal (model.apply) cukup untuk mendapatkan prediksi setiap tree,
+sehingga point estimate dan kuantil dihitung sekaligus tanpa memanggil
+setiap estimator satu per satu.
+"""
+
+import numpy as np
+
+
+class ForestLeafTable:
+    """Nilai leaf semua tree dalam satu array, disusun sekali saat model di-load"""
+
+    def __init__(self, model):
+        trees = [est.tree_ for est in model.estimators_]
+        sizes = np.array([t.node_count for t in trees], dtype=np.intp)
+        self.model = model
+        self.n_trees = len(trees)
+        # Offset node pertama tiap tree di array values
+        self.offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.intp)
+        self.values = np.concatenate([t.value[:, 0, 0] for t in trees])
+
+    def tree_predictions(self, X):
+        """Prediksi setiap tree, shape (n_samples, n_trees)"""
+        leaves = self.model.apply(X)
+        return self.values[leaves + self.offsets]
+
+    def predict(self, X, quantiles=None):
+        """
+        Prediksi log price beserta kuantilnya dalam satu traversal.
+
+        Returns:
+            (mean, q) - mean shape (n_samples,), q shape (len(quantiles), n_samples)
+            atau None jika quantiles kosong
+        """
+        per_tree = self.tree_predictions(X)
+        mean = per_tree.mean(axis=1)
+        if not quantiles:
+            return mean, None
+        return mean, np.quantile(per_tree, quantiles, axis=1)
+
+
+def _to_float(value, message):
+    """float() untuk input client, TypeError/ValueError -> ValueError(message)"""
+    if isinstance(value, bool):
+        raise ValueError(message)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(message) from None
+
+
+def parse_quantiles(data):
+    """
+    Ambil kuantil yang diminta dari request body.
+
+    Mendukung "interval" (confidence level, misal 0.9 -> kuantil 0.05 & 0.95)
+    dan "quantiles" (list kuantil, misal [0.1, 0.5, 0.9]).
+
+    Returns:
+        (level, quantiles) - level None jika interval tidak diminta
+    Raises:
+        ValueError jika nilai bukan angka atau tidak di antara 0 dan 1
+    """
+    level = data.get('interval')
+    quantiles = data.get('quantiles') or []
+    if not isinstance(quantiles, list):
+        raise ValueError("quantiles must be a list of numbers between 0 and 1")
+    quantiles = [_to_float(q, "quantiles must be a list of numbers between 0 and 1")
+                 for q in quantiles]
+    if any(not (0.0 < q < 1.0) for q in quantiles):
+        raise ValueError("quantiles must be between 0 and 1")
+
+    if level is not None:
+        level = _to_float(level, "interval must be a number between 0 and 1")
+        if not (0.0 < level < 1.0):
+            raise ValueError("interval must be between 0 and 1")
+        alpha = (1.0 - level) / 2.0
+        quantiles = [alpha, 1.0 - alpha] + quantiles
+    return level, quantiles
+
+
+def format_quantiles(level, quantiles, q_prices, i):
+    """Susun field interval/quantiles di response untuk baris ke-i"""
+    result = {}
+    offset = 0
+    if level is not None:
+        result['interval'] = {
+            "level": level,
+            "lower_usd": round(float(q_prices[0][i]), 2),
+            "upper_usd": round(float(q_prices[1][i]), 2)
+        }
+        offset = 2
+    if len(quantiles) > offset:
+        result['quantiles'] = {
+            f"{q:g}": round(float(q_prices[j][i]), 2)
+            for j, q in enumerate(quantiles) if j >= offset
+        }
+    return result
@@ -0,0 +1,361 @@
+"""
+Diamond Price Prediction - Bulk Repricing Jobs
+Job scoring file CSV besar secara async, dengan checkpoint per chunk.
+
+- Antrian job dan checkpoint disimpan di SQLite (JOBS_DB), tanpa service luar
+- Worker (`python jobs.py worker`) memproses file per chunk. Hasil setiap
+  chunk ditulis atomik ke `JOBS_DIR/<job_id>/chunk-000000.csv`, lalu
+  checkpoint-nya di-commit. Chunk yang sudah punya checkpoint tidak diproses
+  ulang, jadi job yang workernya mati dilanjutkan dari chunk terakhir
+- Worker mengirim heartbeat per chunk. Job `running` yang heartbeat-nya
+  melewati JOBS_LEASE (atau prosesnya sudah mati di host yang sama) diambil
+  alih worker lain
+
+Usage:
+    python jobs.py submit inventory.csv [--chunk-size 50000]
+    python jobs.py status <job_id>
+    python jobs.py worker [--model-dir .] [--once]
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+import numpy as np
+
+from forksafe import SQLiteConnections
+from predictor import Predictor
+from validation import ERROR_CODES
+
+JOBS_DB = os.environ.get('JOBS_DB', 'jobs.db')
+JOBS_DIR = os.environ.get('JOBS_DIR', 'jobs')
+JOBS_LEASE = float(os.environ.get('JOBS_LEASE', 60))
+DEFAULT_CHUNK_SIZE = int(os.environ.get('JOBS_CHUNK_SIZE', 50000))
+
+STATUSES = ['queued', 'running', 'done', 'failed', 'cancelled']
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        input_path TEXT NOT NULL,
+        chunk_size INTEGER NOT NULL,
+        total_rows INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        rows_done INTEGER NOT NULL DEFAULT 0,
+        rows_invalid INTEGER NOT NULL DEFAULT 0,
+        chunks_done INTEGER NOT NULL DEFAULT 0,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        worker TEXT,
+        heartbeat REAL,
+        model_version TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS checkpoints (
+        job_id TEXT NOT NULL,
+        chunk INTEGER NOT NULL,
+        rows INTEGER NOT NULL,
+        invalid INTEGER NOT NULL,
+        seconds REAL NOT NULL,
+        finished_at REAL NOT NULL,
+        PRIMARY KEY (job_id, chunk)
+    )""",
+    "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)",
+]
+
+
+def count_rows(path):
+    """Jumlah baris data di CSV (tanpa header)"""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(0, lines - 1)
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def worker_alive(worker):
+    """False jika worker ada di host ini dan prosesnya sudah tidak ada"""
+    host, _, pid = (worker or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobQueue:
+    """Antrian job dan checkpoint di file SQLite, dibagi antar proses"""
+
+    def __init__(self, path=JOBS_DB, jobs_dir=JOBS_DIR):
+        self.path = path
+        self.jobs_dir = jobs_dir
+        self._connections = SQLiteConnections(path, timeout=10.0, setup=SCHEMA,
+                                              row_factory=sqlite3.Row)
+
+    def output_dir(self, job_id):
+        return os.path.join(self.jobs_dir, job_id)
+
+    def chunk_path(self, job_id, chunk):
+        return os.path.join(self.output_dir(job_id), f"chunk-{chunk:06d}.csv")
+
+    def submit(self, input_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Daftarkan job baru, return job id"""
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        input_path = os.path.abspath(input_path)
+        total_rows = count_rows(input_path)
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.output_dir(job_id), exist_ok=True)
+        self._connections.get().execute(
+            "INSERT INTO jobs (id, input_path, chunk_size, total_rows, status, created_at) "
+            "VALUES (?, ?, ?, ?, 'queued', ?)",
+            (job_id, input_path, chunk_size, total_rows, time.time())
+        )
+        return job_id
+
+    def get(self, job_id):
+        """Status dan progress job (dict), None jika tidak ada"""
+        row = self._connections.get().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['chunks_total'] = -(-job['total_rows'] // job['chunk_size'])
+        job['progress'] = round(job['rows_done'] / job['total_rows'], 4) if job['total_rows'] else 1.0
+        elapsed = (job['finished_at'] or time.time()) - job['started_at'] if job['started_at'] else 0
+        job['rows_per_second'] = round(job['rows_done'] / elapsed, 1) if elapsed > 0 else None
+        return job
+
+    def completed_chunks(self, job_id):
+        rows = self._connections.get().execute(
+            "SELECT chunk FROM checkpoints WHERE job_id = ?", (job_id,)
+        ).fetchall()
+        return {row['chunk'] for row in rows}
+
+    def cancel(self, job_id):
+        cursor = self._connections.get().execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ? "
+            "WHERE id = ? AND status IN ('queued', 'running')",
+            (time.time(), job_id)
+        )
+        return cursor.rowcount > 0
+
+    def claim(self, worker):
+        """
+        Ambil satu job: job queued tertua, atau job running yang lease-nya
+        habis / workernya sudah mati. Returns dict job atau None.
+        """
+        conn = self._connections.get()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            candidates = conn.execute(
+                "SELECT id, status, worker, heartbeat FROM jobs "
+                "WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+            claimed = None
+            for row in candidates:
+                if row['status'] == 'queued' or row['heartbeat'] < now - JOBS_LEASE \
+                        or not worker_alive(row['worker']):
+                    claimed = row['id']
+                    break
+            if claimed is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, heartbeat = ?, "
+                    "attempts = attempts + 1, started_at = COALESCE(started_at, ?) WHERE id = ?",
+                    (worker, now, now, claimed)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(claimed) if claimed is not None else None
+
+    def checkpoint(self, job_id, worker, chunk, rows, invalid, seconds):
+        """
+        Catat chunk selesai dan perbarui heartbeat. Returns False jika job
+        sudah tidak dimiliki worker ini (diambil alih atau dibatalkan).
+        """
+        conn = self._connections.get()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            owner = conn.execute(
+                "SELECT worker, status FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if owner is None or owner['worker'] != worker or owner['status'] != 'running':
+                conn.execute("ROLLBACK")
+                return False
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO checkpoints (job_id, chunk, rows, invalid, seconds, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, chunk, rows, invalid, seconds, now)
+            ).rowcount
+            conn.execute(
+                "UPDATE jobs SET heartbeat = ?, rows_done = rows_done + ?, "
+                "rows_invalid = rows_invalid + ?, chunks_done = chunks_done + ? WHERE id = ?",
+                (now, rows * inserted, invalid * inserted, inserted, job_id)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def finish(self, job_id, worker, status, error=None, model_version=None):
+        self._connections.get().execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, "
+            "model_version = COALESCE(?, model_version) WHERE id = ? AND worker = ? AND status = 'running'",
+            (status, error, time.time(), model_version, job_id, worker)
+        )
+
+    def stream_results(self, job_id, follow=False, poll_interval=0.5, max_seconds=None):
+        """
+        Generator hasil CSV per chunk secara berurutan (header sekali).
+        follow=True menunggu chunk berikutnya sampai job selesai, atau
+        sampai max_seconds (stream berhenti, client bisa request ulang).
+        """
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+        job = self.get(job_id)
+        if job is None:
+            return
+        header_sent = False
+        chunk = 0
+        while chunk < job['chunks_total']:
+            path = self.chunk_path(job_id, chunk)
+            if chunk in self.completed_chunks(job_id) and os.path.exists(path):
+                with open(path, 'rb') as f:
+                    header = f.readline()
+                    if not header_sent:
+                        yield header
+                        header_sent = True
+                    for block in iter(lambda: f.read(1024 * 1024), b''):
+                        yield block
+                chunk += 1
+                continue
+            job = self.get(job_id)
+            if not follow or job['status'] not in ('queued', 'running'):
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(poll_interval)
+
+
+class JobWorker:
+    """Worker yang memproses job dari JobQueue per chunk"""
+
+    def __init__(self, queue, bundle, poll_interval=1.0):
+        self.queue = queue
+        self.bundle = bundle
+        self.predictor = Predictor(bundle)
+        self.poll_interval = poll_interval
+        self.worker = worker_id()
+
+    def score_chunk(self, df):
+        """Validasi vectorized + prediksi satu chunk, return (DataFrame hasil, jumlah invalid)"""
+        result = self.predictor.validate(df)
+        prices = self.predictor.predict(result, on_invalid='nan')
+        out = df.copy()
+        out['price_usd'] = np.round(prices, 2)
+        # Kode error pertama per baris (kosong jika valid)
+        error = np.full(len(df), '', dtype=object)
+        for name, codes in reversed(list(result.codes.items())):
+            bad = codes != 0
+            error[bad] = [f"{name}:{ERROR_CODES[c]}" for c in codes[bad].tolist()]
+        out['error'] = error
+        return out, int((~result.valid).sum())
+
+    def run_job(self, job):
+        import pandas as pd
+
+        job_id = job['id']
+        done = self.queue.completed_chunks(job_id)
+        reader = pd.read_csv(job['input_path'], chunksize=job['chunk_size'])
+        for chunk, df in enumerate(reader):
+            if chunk in done:
+                continue
+            start = time.perf_counter()
+            out, invalid = self.score_chunk(df)
+            out.insert(0, 'row', np.arange(chunk * job['chunk_size'], chunk * job['chunk_size'] + len(df)))
+            path = self.queue.chunk_path(job_id, chunk)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            out.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            if not self.queue.checkpoint(job_id, self.worker, chunk, len(df), invalid,
+                                         time.perf_counter() - start):
+                print(f"⚠️ Job {job_id} no longer owned by this worker, stopping")
+                return
+        self.queue.finish(job_id, self.worker, 'done', model_version=self.bundle.version)
+
+    def run_once(self):
+        """Proses satu job jika ada. Returns True jika ada job yang diproses."""
+        job = self.queue.claim(self.worker)
+        if job is None:
+            return False
+        print(f"▶️ Job {job['id']}: {job['total_rows']:,} rows, "
+              f"{job['chunks_done']}/{job['chunks_total']} chunks done")
+        try:
+            self.run_job(job)
+        except Exception as e:
+            self.queue.finish(job['id'], self.worker, 'failed', error=str(e))
+            print(f"❌ Job {job['id']} failed: {e}")
+        return True
+
+    def run(self, once=False):
+        while True:
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                # Error antrian (misal SQLite terkunci): worker tetap hidup
+                print(f"⚠️ Job queue error: {e}")
+                processed = False
+            if once and not processed:
+                return
+            if not processed:
+                time.sleep(self.poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk repricing jobs")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_submit = sub.add_parser('submit', help="Submit file CSV untuk di-scoring")
+    p_submit.add_argument('input')
+    p_submit.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    p_status = sub.add_parser('status', help="Progress job")
+    p_status.add_argument('job_id')
+    p_worker = sub.add_parser('worker', help="Jalankan worker")
+    p_worker.add_argument('--model-dir', default=os.environ.get('MODEL_DIR', '.'))
+    p_worker.add_argument('--once', action='store_true', help="Berhenti jika antrian kosong")
+    args = parser.parse_args()
+
+    queue = JobQueue()
+    if args.command == 'submit':
+        print(queue.submit(args.input, args.chunk_size))
+    elif args.command == 'status':
+        print(json.dumps(queue.get(args.job_id), indent=2))
+    else:
+        from bundle import load_bundle
+        bundle = load_bundle(args.model_dir)
+        print(f"✅ Worker {worker_id()} ready (model {bundle.version})")
+        JobWorker(queue, bundle).run(once=args.once)
+
+
+if __name__ == '__main__':
+    main()
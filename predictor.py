@@ -0,0 +1,204 @@
+"""
+Diamond Price Prediction - In-Process Predictor
+Prediksi harga langsung dari Python, tanpa HTTP.
+
+    from predictor import Predictor
+
+    predictor = Predictor.load('.')
+    prices = predictor.predict(df)              # pandas DataFrame
+    prices = predictor.predict(arrow_table)     # pyarrow Table / RecordBatch
+    prices = predictor.predict({'carat': carat_array, 'cut': cut_array, ...})
+
+Input yang diterima: pandas DataFrame, pyarrow Table / RecordBatch, dict
+kolom (array NumPy / list), NumPy structured array, list dict, atau satu
+dict. Kolom numerik dibaca tanpa copy jika dtype-nya sudah float64
+(pandas, NumPy, Arrow satu chunk tanpa null). Kolom kategori
+pandas/Arrow dipetakan lewat kode kategorinya, tanpa membuat object
+Python per baris.
+
+Predictor tidak menyimpan state yang berubah setelah dibuat, jadi satu
+instance aman dipakai bersamaan dari banyak thread.
+"""
+
+import numpy as np
+import pandas as pd
+
+from bundle import load_bundle
+from validation import BatchResult, check_column_lengths, error_summary, validator
+
+
+class Predictor:
+    """Wrapper ModelBundle untuk prediksi kolumnar in-process"""
+
+    def __init__(self, bundle):
+        self.bundle = bundle
+        # Lookup nilai kategori -> index (urutan VALID_*) per field
+        self._choice_index = {
+            name: pd.Index(field.values)
+            for name, field in validator.fields.items() if hasattr(field, 'values')
+        }
+
+    @classmethod
+    def load(cls, directory='.', version=None):
+        """Load model dari folder (model.bundle atau tiga file .pkl)"""
+        return cls(load_bundle(directory, version))
+
+    @property
+    def version(self):
+        return self.bundle.version
+
+    def _columns(self, data):
+        """
+        Returns (n_rows, dict field -> (array, lookup)) - array berupa nilai
+        numerik, array string, atau index kategori (int) dengan lookup nilai
+        asli untuk pesan error.
+        """
+        if isinstance(data, pd.DataFrame):
+            n_rows = len(data)
+            get = lambda name: self._pandas_column(name, data[name])
+        elif hasattr(data, 'schema') and hasattr(data, 'column'):
+            n_rows = data.num_rows
+            get = lambda name: self._arrow_column(name, data.column(name))
+        elif isinstance(data, np.ndarray) and data.dtype.names:
+            n_rows = len(data)
+            get = lambda name: self._numpy_column(name, data[name])
+        elif isinstance(data, dict):
+            n_rows = check_column_lengths(data)
+            get = lambda name: self._numpy_column(name, np.asarray(data[name]))
+        else:
+            raise TypeError(f"Unsupported input type: {type(data).__name__}")
+
+        names = data.dtype.names if isinstance(data, np.ndarray) else (
+            data.schema.names if hasattr(data, 'schema') else list(data))
+        missing = [name for name in validator.fields if name not in names]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+        return n_rows, {name: get(name) for name in validator.fields}
+
+    def _numpy_column(self, name, column):
+        if name in self._choice_index and column.dtype == object:
+            return self._object_indices(name, column)
+        return column, None
+
+    def _pandas_column(self, name, series):
+        if name not in self._choice_index:
+            return series.to_numpy(), None
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Petakan kategori (bukan per baris), kode -1 (NaN) tetap -1
+            remap = np.append(self._choice_index[name].get_indexer(series.cat.categories), -1)
+            return remap[series.cat.codes.to_numpy()], series.to_numpy
+        if getattr(series.dtype, 'storage', None) == 'pyarrow' or isinstance(series.dtype, pd.ArrowDtype):
+            # String pandas berbasis Arrow (default pandas 3): pakai buffer Arrow-nya langsung
+            import pyarrow as pa
+            return self._arrow_column(name, pa.array(series.array))
+        return self._object_indices(name, series.to_numpy())
+
+    def _object_indices(self, name, column):
+        """Index kategori dari array object (hash lookup di C)"""
+        try:
+            indices = self._choice_index[name].get_indexer(column)
+        except TypeError:
+            return column, None
+        return indices, lambda: column
+
+    def _arrow_column(self, name, column):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if name not in self._choice_index:
+            # Zero-copy jika satu chunk tanpa null
+            return column.to_numpy(zero_copy_only=False), None
+        values = pa.array(self._choice_index[name].tolist())
+        parts = []
+        # Table -> ChunkedArray, RecordBatch -> Array
+        for chunk in getattr(column, 'chunks', [column]):
+            if pa.types.is_dictionary(chunk.type):
+                remap = np.append(self._choice_index[name].get_indexer(chunk.dictionary.to_pylist()), -1)
+                codes = pc.fill_null(chunk.indices, -1).to_numpy(zero_copy_only=False)
+                parts.append(remap[codes])
+            else:
+                parts.append(pc.fill_null(pc.index_in(chunk, value_set=values), -1)
+                             .to_numpy(zero_copy_only=False))
+        indices = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        return indices, lambda: column
+
+    def validate(self, data):
+        """Validasi input kolumnar, return BatchResult"""
+        if isinstance(data, dict) and not all(np.ndim(v) == 1 for v in data.values()):
+            data = [data]
+        if isinstance(data, list):
+            return validator.validate_rows(data)
+        n_rows, columns = self._columns(data)
+        values, codes = {}, {}
+        for name, field in validator.fields.items():
+            column, lookup = columns[name]
+            if name in self._choice_index and column.dtype.kind in 'iu':
+                # Nilai asli hanya diambil untuk baris yang invalid
+                raw = (lambda positions, lookup=lookup: _take(lookup(), positions)) if lookup else None
+                values[name], codes[name] = field.check_indices(column, raw)
+            else:
+                values[name], codes[name] = field.check_column(column)
+        return BatchResult(validator, values, codes, n_rows)
+
+    def predict_log(self, data, quantiles=None):
+        """
+        Prediksi log price untuk input yang semua barisnya valid
+        (data mentah atau BatchResult).
+
+        Returns:
+            (log_prices, log_q) - log_q None jika quantiles kosong
+        """
+        result = data if isinstance(data, BatchResult) else self.validate(data)
+        if not result.all_valid:
+            raise ValueError(_invalid_message(result))
+        if result.n_rows == 0:
+            return np.empty(0), (np.empty((len(quantiles), 0)) if quantiles else None)
+        return self.bundle.predict_log(self.bundle.encode_columns(result.values), quantiles)
+
+    def predict(self, data, quantiles=None, on_invalid='raise'):
+        """
+        Prediksi harga USD.
+
+        Args:
+            quantiles: optional list kuantil (0-1) untuk prediction interval
+            on_invalid: 'raise' (ValueError jika ada baris invalid) atau
+                'nan' (harga NaN untuk baris invalid)
+
+        Returns:
+            array harga (n,), atau (harga, harga kuantil (len(quantiles), n))
+            jika quantiles diisi
+        """
+        result = data if isinstance(data, BatchResult) else self.validate(data)
+        if result.all_valid:
+            log_prices, log_q = self.predict_log(result, quantiles)
+            prices = np.exp(log_prices)
+            q_prices = np.exp(log_q) if log_q is not None else None
+        elif on_invalid == 'nan':
+            valid = result.valid
+            prices = np.full(result.n_rows, np.nan)
+            q_prices = np.full((len(quantiles), result.n_rows), np.nan) if quantiles else None
+            if valid.any():
+                values = {name: column[valid] for name, column in result.values.items()}
+                log_prices, log_q = self.bundle.predict_log(self.bundle.encode_columns(values), quantiles)
+                prices[valid] = np.exp(log_prices)
+                if q_prices is not None:
+                    q_prices[:, valid] = np.exp(log_q)
+        else:
+            raise ValueError(_invalid_message(result))
+        return (prices, q_prices) if quantiles else prices
+
+
+def _take(values, positions):
+    """Ambil nilai asli (NumPy / Arrow) di posisi tertentu, NaN/NA pandas -> None"""
+    if isinstance(values, np.ndarray):
+        values = values[positions].tolist()
+    else:
+        values = values.take(positions).to_pylist()
+    return [None if value is pd.NA or (type(value) is float and value != value) else value
+            for value in values]
+
+
+def _invalid_message(result):
+    n_invalid = int((~result.valid).sum())
+    return (f"{n_invalid} of {result.n_rows} rows failed validation: "
+            f"{error_summary(result.errors(limit=5))}")
@@ -0,0 +1,153 @@
+"""
+Diamond Price Prediction - Rate Limiting
+Token bucket rate limiter per client dan concurrency gate untuk API.
+
+Backend state bucket pluggable:
+- MemoryBackend: dict in-process (default)
+- SQLiteBackend: file SQLite lokal, dipakai bersama oleh semua worker
+  gunicorn di satu host (pengganti shared store seperti Redis)
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from forksafe import SQLiteConnections
+
+
+def _spend(tokens, cost, rate, burst):
+    """
+    Ambil `cost` token dari bucket berisi `tokens`.
+
+    Request dengan cost lebih besar dari burst diizinkan saat bucket penuh,
+    lalu bucket menjadi negatif (utang) yang dibayar dengan refill, jadi
+    batch besar tetap dihitung penuh.
+
+    Returns:
+        (allowed, sisa_token, retry_after)
+    """
+    needed = min(cost, burst)
+    if tokens >= needed:
+        return True, tokens - cost, 0.0
+    return False, tokens, (needed - tokens) / rate
+
+
+class MemoryBackend:
+    """State token bucket di memory, dengan batas jumlah key (LRU)"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, cost, rate, burst, now):
+        """
+        Ambil token dari bucket key.
+
+        Returns:
+            (allowed, retry_after) - retry_after dalam detik jika ditolak
+        """
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - last) * rate)
+            allowed, tokens, retry_after = _spend(tokens, cost, rate, burst)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class SQLiteBackend:
+    """State token bucket di file SQLite, dibagi antar proses"""
+
+    def __init__(self, path):
+        self.path = path
+        self._connections = SQLiteConnections(path, timeout=1.0, synchronous='OFF', setup=[
+            "CREATE TABLE IF NOT EXISTS buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        ])
+
+    def take(self, key, cost, rate, burst, now):
+        conn = self._connections.get()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, last = row if row else (burst, now)
+            tokens = min(burst, tokens + max(0.0, now - last) * rate)
+            allowed, tokens, retry_after = _spend(tokens, cost, rate, burst)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+
+class RateLimiter:
+    """
+    Token bucket rate limiter.
+
+    Args:
+        backend: MemoryBackend atau SQLiteBackend
+        rate: jumlah token yang diisi ulang per detik
+        burst: kapasitas maksimum bucket
+    """
+
+    def __init__(self, backend, rate, burst):
+        if not rate > 0:
+            raise ValueError(f"Rate limit rate must be > 0, got {rate}")
+        if not burst >= 1:
+            raise ValueError(f"Rate limit burst must be >= 1, got {burst}")
+        self.backend = backend
+        self.rate = float(rate)
+        self.burst = float(burst)
+
+    def check(self, key, cost=1):
+        """Returns (allowed, retry_after_detik)"""
+        return self.backend.take(key, float(cost), self.rate, self.burst, time.time())
+
+
+class ConcurrencyGate:
+    """
+    Batas jumlah request yang diproses bersamaan.
+
+    Request yang tidak mendapat slot dalam `timeout` detik ditolak
+    (load shedding), bukan diantrekan tanpa batas.
+    """
+
+    def __init__(self, max_inflight, timeout=0.0):
+        self.max_inflight = max_inflight
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(max_inflight)
+
+    def acquire(self):
+        if self.timeout > 0:
+            return self._semaphore.acquire(timeout=self.timeout)
+        return self._semaphore.acquire(blocking=False)
+
+    def try_acquire(self):
+        """Ambil slot hanya jika ada yang kosong sekarang (tanpa menunggu)"""
+        return self._semaphore.acquire(blocking=False)
+
+    def release(self):
+        self._semaphore.release()
+
+
+def retry_after_header(seconds):
+    """Nilai header Retry-After (detik, dibulatkan ke atas, minimal 1)"""
+    return str(max(1, math.ceil(seconds)))
+
+
+def create_limiter(backend='memory', rate=10.0, burst=20.0, db_path='ratelimit.db'):
+    """Buat RateLimiter sesuai nama backend"""
+    if backend == 'memory':
+        return RateLimiter(MemoryBackend(), rate, burst)
+    if backend == 'sqlite':
+        return RateLimiter(SQLiteBackend(db_path), rate, burst)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
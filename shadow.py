@@ -0,0 +1,202 @@
+"""
+Diamond Price Prediction - Shadow & Canary Evaluation
+Evaluasi model kandidat di traffic live tanpa memperlambat response.
+
+Mode:
+- shadow: semua response dari model utama; kandidat di-score di
+  background executor untuk sebagian traffic (SHADOW_SAMPLE_PERCENT)
+- canary: CANARY_PERCENT request dilayani kandidat; model yang tidak
+  melayani request di-score di background untuk statistik perbandingan
+
+Pekerjaan background dibatasi (max_pending). Jika executor penuh,
+scoring dilewati dan dihitung di `skipped`, tidak pernah diantrekan
+di request path. Dengan concurrency gate, scoring juga dilewati (`busy`)
+jika gate tidak punya slot kosong, jadi kandidat hanya memakai kapasitas
+yang sedang tidak dipakai request.
+"""
+
+import math
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from forksafe import ProcessOwner
+from predictor import Predictor
+
+
+class DisagreementStats:
+    """
+    Statistik selisih log price kandidat vs model utama.
+
+    Momen setiap batch dihitung vectorized lalu digabung ke total dengan
+    update paralel Chan et al., jadi lock hanya dipegang untuk beberapa
+    operasi scalar per batch.
+    """
+
+    def __init__(self, threshold_pct=10.0):
+        self.threshold = math.log1p(threshold_pct / 100.0)
+        self.threshold_pct = threshold_pct
+        self._lock = threading.Lock()
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.abs_sum = 0.0
+        self.max_abs = 0.0
+        self.over_threshold = 0
+
+    def update(self, diffs):
+        """diffs = log(candidate) - log(primary), array"""
+        diffs = np.asarray(diffs, dtype=float)
+        n = len(diffs)
+        if n == 0:
+            return
+        # Momen batch di NumPy, di luar lock
+        mean = float(diffs.mean())
+        m2 = float(np.square(diffs - mean).sum())
+        abs_diffs = np.abs(diffs)
+        abs_sum = float(abs_diffs.sum())
+        max_abs = float(abs_diffs.max())
+        over = int(np.count_nonzero(abs_diffs > self.threshold))
+        with self._lock:
+            total = self.count + n
+            delta = mean - self.mean
+            self.mean += delta * n / total
+            self._m2 += m2 + delta * delta * self.count * n / total
+            self.count = total
+            self.abs_sum += abs_sum
+            self.max_abs = max(self.max_abs, max_abs)
+            self.over_threshold += over
+
+    def summary(self):
+        with self._lock:
+            if self.count == 0:
+                return {"count": 0}
+            std = math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+            return {
+                "count": self.count,
+                # Bias kandidat relatif ke model utama (positif = kandidat lebih mahal)
+                "mean_pct_diff": round(math.expm1(self.mean) * 100, 3),
+                "std_log_diff": round(std, 5),
+                "mean_abs_pct_diff": round(math.expm1(self.abs_sum / self.count) * 100, 3),
+                "max_abs_pct_diff": round(math.expm1(self.max_abs) * 100, 3),
+                "over_threshold_pct": round(self.over_threshold / self.count * 100, 3),
+                "threshold_pct": self.threshold_pct
+            }
+
+
+class ShadowEvaluator:
+    """
+    Routing canary dan scoring shadow untuk model kandidat.
+
+    Args:
+        candidate: ModelBundle kandidat (di-wrap sebagai Predictor)
+        mode: "shadow" atau "canary"
+        canary_percent: persentase request yang dilayani kandidat (mode canary)
+        sample_percent: persentase request yang di-score di background
+        max_pending: batas job background yang belum selesai
+        gate: optional ConcurrencyGate request. Scoring background hanya
+            jalan jika gate punya slot kosong (slot dipakai selama scoring),
+            jadi shadow tidak bersaing dengan request saat worker sibuk.
+    """
+
+    def __init__(self, candidate, mode='shadow', canary_percent=0.0, sample_percent=10.0,
+                 max_pending=32, threshold_pct=10.0, gate=None):
+        if mode not in ('shadow', 'canary'):
+            raise ValueError(f"Unknown shadow mode: {mode}")
+        self.candidate = candidate
+        self.candidate_predictor = Predictor(candidate)
+        self.mode = mode
+        self.canary_percent = canary_percent
+        self.sample_percent = sample_percent
+        self.max_pending = max_pending
+        self.gate = gate
+        self.stats = DisagreementStats(threshold_pct)
+        self.served = {"primary": 0, "candidate": 0}
+        self.skipped = 0
+        self.busy = 0
+        self.errors = 0
+        self.last_error = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._owner = ProcessOwner()
+
+    def start(self):
+        """Buat executor background (idempotent, aman setelah fork)"""
+        if self._executor is not None and self._owner.owned():
+            return
+        if self._owner.claim():
+            # Proses hasil fork: lock parent bisa ter-copy dalam keadaan terkunci
+            self._lock = threading.Lock()
+            self.stats._lock = threading.Lock()
+        self._pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+
+    def choose(self, primary):
+        """Pilih Predictor yang melayani request ini (primary = Predictor model utama)"""
+        use_candidate = self.mode == 'canary' and random.random() * 100 < self.canary_percent
+        with self._lock:
+            self.served["candidate" if use_candidate else "primary"] += 1
+        return self.candidate_predictor if use_candidate else primary
+
+    def submit(self, primary, served, data, served_log_prices):
+        """
+        Score model yang tidak melayani request di background.
+        Tidak pernah blocking: dilewati jika executor penuh.
+
+        Args:
+            primary, served: Predictor model utama dan yang melayani request
+            data: input yang sudah divalidasi (BatchResult atau list dict)
+        """
+        if self._executor is None or random.random() * 100 >= self.sample_percent:
+            return False
+        other = self.candidate_predictor if served is primary else primary
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.skipped += 1
+                return False
+            self._pending += 1
+        self._executor.submit(self._score, other, served is primary, data, served_log_prices)
+        return True
+
+    def _score(self, other, served_by_primary, data, served_log_prices):
+        try:
+            if self.gate is not None and not self.gate.try_acquire():
+                # Semua slot dipakai request: lewati, jangan tambah beban
+                with self._lock:
+                    self.busy += 1
+                return
+            try:
+                other_log, _ = other.predict_log(data)
+            finally:
+                if self.gate is not None:
+                    self.gate.release()
+            # Selalu kandidat - utama
+            diffs = other_log - served_log_prices if served_by_primary else served_log_prices - other_log
+            self.stats.update(np.asarray(diffs))
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+                self.last_error = str(e)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def summary(self):
+        with self._lock:
+            state = {
+                "mode": self.mode,
+                "candidate_version": self.candidate.version,
+                "canary_percent": self.canary_percent,
+                "sample_percent": self.sample_percent,
+                "served": dict(self.served),
+                "pending": self._pending,
+                "skipped": self.skipped,
+                "busy": self.busy,
+                "errors": self.errors,
+                "last_error": self.last_error
+            }
+        state["disagreement"] = self.stats.summary()
+        return state
@@ -0,0 +1,96 @@
+"""
+Parity validator scalar vs vectorized: kode error per field harus sama
+untuk nilai yang sama, baik lewat dict (validate), list dict
+(validate_rows), maupun kolom NumPy bertipe (validate_columns).
+"""
+
+import numpy as np
+import pytest
+
+from predictor import Predictor
+from validation import ERROR_CODES, validator
+
+VALID = {'carat': 1.0, 'cut': 'Ideal', 'color': 'G', 'clarity': 'VS1', 'table': 57.0}
+
+NUMBER_VALUES = [1.0, 2, 0.1, 99.0, float('nan'), float('inf'), '1.5', 'abc', '', None,
+                 True, False, [1.0], {}, 10 ** 400, -10 ** 400]
+CHOICE_VALUES = ['Ideal', 'G', 'VS1', 'ideal', '', None, 1, 1.5, True, ['Ideal'], {}]
+
+
+def scalar_codes(row):
+    _, errors = validator.validate(row)
+    codes = {name: 'ok' for name in validator.fields}
+    codes.update({error['field']: error['code'] for error in errors})
+    return codes
+
+
+def batch_codes(result, row):
+    return {name: ERROR_CODES[codes[row]] for name, codes in result.codes.items()}
+
+
+def cases():
+    for name in ('carat', 'table'):
+        for value in NUMBER_VALUES:
+            yield name, value
+    for name in ('cut', 'color', 'clarity'):
+        for value in CHOICE_VALUES:
+            yield name, value
+
+
+@pytest.mark.parametrize('name,value', list(cases()))
+def test_rows_match_scalar(name, value):
+    row = {**VALID, name: value}
+    result = validator.validate_rows([VALID, row])
+    assert batch_codes(result, 0) == scalar_codes(VALID)
+    assert batch_codes(result, 1) == scalar_codes(row)
+
+
+@pytest.mark.parametrize('column', [
+    np.array([True, False]),
+    np.array([1, 2], dtype=np.int64),
+    np.array([0.5, 9.0]),
+    np.array(['1.0', 'x']),
+])
+def test_typed_number_column_matches_scalar(column):
+    result = validator.validate_columns({**{k: [v] * len(column) for k, v in VALID.items()},
+                                         'carat': column})
+    for i, value in enumerate(column.tolist()):
+        assert batch_codes(result, i) == scalar_codes({**VALID, 'carat': value})
+
+
+def test_huge_int_column_matches_scalar():
+    column = np.array([1, 10 ** 400, -10 ** 400], dtype=object)
+    result = validator.validate_columns({**{k: [v] * len(column) for k, v in VALID.items()},
+                                         'carat': column})
+    for i, value in enumerate(column.tolist()):
+        assert batch_codes(result, i) == scalar_codes({**VALID, 'carat': value})
+
+
+@pytest.mark.parametrize('value', [[1.0, 2.0], ['Ideal', 'G']])
+def test_same_length_list_values_stay_one_column(value):
+    rows = [{**VALID, 'carat': value, 'cut': value}] * 3
+    result = validator.validate_rows(rows)
+    for i in range(len(rows)):
+        assert batch_codes(result, i) == scalar_codes(rows[i])
+
+
+def test_missing_field_matches_scalar():
+    row = {k: v for k, v in VALID.items() if k != 'color'}
+    assert batch_codes(validator.validate_rows([row]), 0) == scalar_codes(row)
+
+
+@pytest.mark.parametrize('row', [None, 1, 'diamond', [VALID]])
+def test_non_object_row_is_one_error(row):
+    result = validator.validate_rows([VALID, row])
+    assert result.valid.tolist() == [True, False]
+    assert result.errors() == [{"row": 1, "field": None, "code": "invalid_type",
+                                "message": "Row must be an object"}]
+
+
+def test_column_lengths_must_match():
+    columns = {**{k: [v] * 3 for k, v in VALID.items()}, 'table': np.array([57.0, 58.0])}
+    with pytest.raises(ValueError, match='Column lengths differ: .*table=2'):
+        validator.validate_columns(columns)
+    # Validasi Predictor tidak memakai model
+    with pytest.raises(ValueError, match='Column lengths differ'):
+        Predictor(None).validate({k: np.asarray(v) for k, v in columns.items()})
@@ -0,0 +1,364 @@
+"""
+Diamond Price Prediction - Input Validation
+Schema input diamond yang dipakai bersama oleh API, Streamlit, dan batch.
+
+Schema deklaratif di-compile sekali menjadi:
+- validator scalar untuk satu input (dict)
+- validator vectorized NumPy untuk input kolom (batch / file)
+
+Keduanya melaporkan semua error per baris dengan kode error yang stabil:
+
+    missing_field   field tidak ada / None
+    invalid_type    tipe salah (bukan angka / bukan string)
+    out_of_range    angka di luar range (termasuk NaN/inf)
+    invalid_choice  nilai kategori tidak dikenal
+
+Baris batch yang bukan object (dict) dilaporkan sebagai satu error
+invalid_type dengan field None.
+"""
+
+import numpy as np
+
+# Opsi valid untuk fitur kategorikal (urutan = urutan kualitas)
+VALID_CUTS = ['Fair', 'Good', 'Very Good', 'Premium', 'Ideal']
+VALID_COLORS = ['J', 'I', 'H', 'G', 'F', 'E', 'D']
+VALID_CLARITIES = ['I1', 'SI2', 'SI1', 'VS2', 'VS1', 'VVS2', 'VVS1', 'IF']
+
+SCHEMA = {
+    'carat': {'type': 'number', 'label': 'Carat', 'min': 0.2, 'max': 5.0},
+    'cut': {'type': 'choice', 'label': 'cut', 'values': VALID_CUTS},
+    'color': {'type': 'choice', 'label': 'color', 'values': VALID_COLORS},
+    'clarity': {'type': 'choice', 'label': 'clarity', 'values': VALID_CLARITIES},
+    'table': {'type': 'number', 'label': 'Table', 'min': 43, 'max': 95},
+}
+
+REQUIRED_FIELDS = list(SCHEMA)
+
+# Kode error stabil (index dipakai di array hasil validasi vectorized)
+ERROR_CODES = ['ok', 'missing_field', 'invalid_type', 'out_of_range', 'invalid_choice']
+OK, MISSING_FIELD, INVALID_TYPE, OUT_OF_RANGE, INVALID_CHOICE = range(len(ERROR_CODES))
+
+ROW_NOT_OBJECT_MESSAGE = "Row must be an object"
+
+# type() elementwise untuk array object
+_TYPE_OF = np.frompyfunc(type, 1, 1)
+
+
+class _NumberField:
+    def __init__(self, name, spec):
+        self.name = name
+        self.low = float(spec['min'])
+        self.high = float(spec['max'])
+        self.messages = {
+            MISSING_FIELD: f"Missing required field: {name}",
+            INVALID_TYPE: f"{spec['label']} must be a number",
+            OUT_OF_RANGE: f"{spec['label']} must be between {spec['min']} and {spec['max']}",
+        }
+
+    def check(self, value):
+        """Returns (nilai, kode_error)"""
+        kind = type(value)
+        if kind is float:
+            pass
+        elif value is None:
+            return None, MISSING_FIELD
+        elif kind is bool:
+            return None, INVALID_TYPE
+        else:
+            try:
+                value = float(value)
+            except OverflowError:
+                # Integer JSON yang terlalu besar untuk float
+                return None, OUT_OF_RANGE
+            except (TypeError, ValueError):
+                return None, INVALID_TYPE
+        if self.low <= value <= self.high:
+            return value, OK
+        return None, OUT_OF_RANGE
+
+    def check_column(self, column):
+        """Returns (array float, array kode error)"""
+        column = np.asarray(column)
+        codes = np.zeros(len(column), dtype=np.int8)
+        if column.dtype.kind in 'iuf':
+            values = column.astype(float, copy=False)
+        elif column.dtype.kind == 'b':
+            # Sama dengan validator scalar: bool bukan angka
+            values = np.full(len(column), np.nan)
+            codes[:] = INVALID_TYPE
+            return values, codes
+        else:
+            try:
+                # Jalur cepat: semua elemen bisa dikonversi di C
+                values = column.astype(float)
+                if column.dtype == object:
+                    # astype(float) menerima None (-> NaN) dan bool (-> 0/1)
+                    codes[_TYPE_OF(column) == bool] = INVALID_TYPE
+                    codes[np.equal(column, None)] = MISSING_FIELD
+            except (TypeError, ValueError, OverflowError):
+                values = np.full(len(column), np.nan)
+                for i, value in enumerate(column.tolist()):
+                    values[i], codes[i] = self.check_type(value)
+        bad_range = ~((values >= self.low) & (values <= self.high))
+        codes[(codes == OK) & bad_range] = OUT_OF_RANGE
+        return values, codes
+
+    def check_type(self, value):
+        if value is None:
+            return np.nan, MISSING_FIELD
+        if isinstance(value, bool):
+            return np.nan, INVALID_TYPE
+        try:
+            return float(value), OK
+        except OverflowError:
+            return np.nan, OUT_OF_RANGE
+        except (TypeError, ValueError):
+            return np.nan, INVALID_TYPE
+
+
+class _ChoiceField:
+    def __init__(self, name, spec):
+        self.name = name
+        self.values = list(spec['values'])
+        self.index = {value: i for i, value in enumerate(self.values)}
+        # Untuk lookup vectorized: nilai terurut + index asli
+        order = np.argsort(self.values)
+        self.sorted_values = np.array(self.values)[order]
+        self.sorted_index = order.astype(np.int8)
+        self.messages = {
+            MISSING_FIELD: f"Missing required field: {name}",
+            INVALID_TYPE: f"{spec['label'].capitalize()} must be a string",
+            INVALID_CHOICE: f"Invalid {spec['label']}. Must be one of: {', '.join(self.values)}",
+        }
+
+    def check(self, value):
+        """Returns (nilai, kode_error)"""
+        if type(value) is str:
+            if value in self.index:
+                return value, OK
+            return None, INVALID_CHOICE
+        if value is None:
+            return None, MISSING_FIELD
+        return None, INVALID_TYPE
+
+    def check_column(self, column):
+        """Returns (array index kategori (-1 jika invalid), array kode error)"""
+        column = np.asarray(column)
+        codes = np.zeros(len(column), dtype=np.int8)
+        if column.dtype.kind != 'U':
+            # Kolom object: tandai None / non-string, sisanya jadi string
+            is_none = np.equal(column, None)
+            is_str = np.fromiter((isinstance(v, str) for v in column.tolist()),
+                                 dtype=bool, count=len(column))
+            if is_str.all():
+                column = column.astype(str)
+            else:
+                codes[is_none] = MISSING_FIELD
+                codes[~is_none & ~is_str] = INVALID_TYPE
+                column = np.where(is_str, column, '').astype(str)
+        pos = np.searchsorted(self.sorted_values, column)
+        pos = np.minimum(pos, len(self.sorted_values) - 1)
+        found = self.sorted_values[pos] == column
+        codes[(codes == OK) & ~found] = INVALID_CHOICE
+        indices = np.where(found, self.sorted_index[pos], -1)
+        return indices, codes
+
+    def check_indices(self, indices, lookup=None):
+        """
+        Validasi index kategori yang sudah dihitung di luar (misal dari kode
+        kategori pandas / Arrow), -1 untuk nilai yang tidak dikenal.
+
+        Args:
+            lookup: optional, fungsi posisi -> nilai asli, dipakai untuk kode
+                error yang tepat (missing / invalid_type) di baris invalid
+        """
+        indices = np.asarray(indices)
+        valid = (indices >= 0) & (indices < len(self.values))
+        codes = np.where(valid, OK, INVALID_CHOICE).astype(np.int8)
+        if not valid.all():
+            indices = np.where(valid, indices, -1)
+            if lookup is not None:
+                bad = np.flatnonzero(~valid)
+                _, codes[bad] = self.check_column(np.array(lookup(bad), dtype=object))
+        return indices, codes
+
+
+class BatchResult:
+    """
+    Hasil validasi vectorized.
+
+    Attributes:
+        valid: bool array (n,), True jika baris lolos semua field
+        values: dict field -> array (float untuk angka, index kategori)
+        codes: dict field -> int8 array kode error (0 = ok)
+        not_object: bool array (n,) baris yang bukan object, atau None
+    """
+
+    def __init__(self, validator, values, codes, n_rows, not_object=None):
+        self.validator = validator
+        self.values = values
+        self.codes = codes
+        self.n_rows = n_rows
+        self.not_object = not_object if not_object is not None and not_object.any() else None
+        self.valid = np.ones(n_rows, dtype=bool)
+        for field_codes in codes.values():
+            self.valid &= field_codes == OK
+        if self.not_object is not None:
+            self.valid &= ~self.not_object
+
+    @property
+    def all_valid(self):
+        return bool(self.valid.all())
+
+    def errors(self, limit=None):
+        """List error {"row", "field", "code", "message"} untuk baris invalid"""
+        errors = []
+        for row in np.flatnonzero(~self.valid).tolist():
+            if self.not_object is not None and self.not_object[row]:
+                # Satu error per baris, bukan missing_field untuk setiap field
+                errors.append({"row": row, "field": None, "code": ERROR_CODES[INVALID_TYPE],
+                               "message": ROW_NOT_OBJECT_MESSAGE})
+                if limit is not None and len(errors) >= limit:
+                    return errors
+                continue
+            for name, field_codes in self.codes.items():
+                code = int(field_codes[row])
+                if code != OK:
+                    errors.append(self.validator.error(name, code, row))
+                    if limit is not None and len(errors) >= limit:
+                        return errors
+        return errors
+
+    def rows(self, mask=None):
+        """Baris valid sebagai list dict nilai yang sudah dikonversi"""
+        mask = self.valid if mask is None else mask
+        columns = {}
+        for name, field in self.validator.fields.items():
+            values = self.values[name][mask]
+            if isinstance(field, _ChoiceField):
+                columns[name] = [field.values[i] for i in values.tolist()]
+            else:
+                columns[name] = values.tolist()
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+class Validator:
+    """Validator hasil compile schema"""
+
+    def __init__(self, schema=SCHEMA):
+        self.fields = {}
+        for name, spec in schema.items():
+            if spec['type'] == 'number':
+                self.fields[name] = _NumberField(name, spec)
+            elif spec['type'] == 'choice':
+                self.fields[name] = _ChoiceField(name, spec)
+            else:
+                raise ValueError(f"Unknown field type for {name}: {spec['type']}")
+        # Pasangan (nama, fungsi check) untuk validator scalar
+        self._checks = [(name, field.check) for name, field in self.fields.items()]
+
+    def error(self, name, code, row=None):
+        error = {
+            "field": name,
+            "code": ERROR_CODES[code],
+            "message": self.fields[name].messages[code]
+        }
+        if row is not None:
+            error = {"row": row, **error}
+        return error
+
+    def validate(self, data):
+        """
+        Validasi satu input (dict).
+
+        Returns:
+            (diamond, errors) - diamond berupa dict nilai yang sudah
+            dikonversi (None jika ada error), errors list semua error
+        """
+        get = data.get
+        diamond = {}
+        errors = None
+        for name, check in self._checks:
+            value, code = check(get(name))
+            if code:
+                errors = errors or []
+                errors.append(self.error(name, code))
+            else:
+                diamond[name] = value
+        return (None, errors) if errors else (diamond, [])
+
+    def valid_batch(self, diamonds):
+        """
+        BatchResult untuk list diamond yang sudah lolos validate() (nilai
+        sudah dikonversi), tanpa validasi ulang.
+        """
+        n_rows = len(diamonds)
+        values, codes = {}, {}
+        for name, field in self.fields.items():
+            if isinstance(field, _ChoiceField):
+                values[name] = np.array([field.index[d[name]] for d in diamonds], dtype=np.int64)
+            else:
+                values[name] = np.array([d[name] for d in diamonds], dtype=float)
+            codes[name] = np.zeros(n_rows, dtype=np.int8)
+        return BatchResult(self, values, codes, n_rows)
+
+    def validate_columns(self, columns):
+        """
+        Validasi input kolom (dict field -> array/list, DataFrame juga bisa).
+        Kolom yang tidak ada dianggap missing untuk semua baris.
+
+        Raises:
+            ValueError: panjang kolom tidak sama
+        """
+        n_rows = check_column_lengths(columns)
+        values, codes = {}, {}
+        for name, field in self.fields.items():
+            if name in columns:
+                values[name], codes[name] = field.check_column(columns[name])
+            else:
+                values[name] = np.full(n_rows, -1 if isinstance(field, _ChoiceField) else np.nan)
+                codes[name] = np.full(n_rows, MISSING_FIELD, dtype=np.int8)
+        return BatchResult(self, values, codes, n_rows)
+
+    def validate_rows(self, rows):
+        """Validasi list dict (misalnya body /predict/batch) secara vectorized"""
+        is_object = [isinstance(row, dict) for row in rows]
+        columns = {}
+        for name in self.fields:
+            # Diisi lewat slice supaya tetap 1-D walaupun nilainya list
+            # dengan panjang sama (np.array akan membuat array 2-D)
+            column = np.empty(len(rows), dtype=object)
+            column[:] = [row.get(name) if ok else None for row, ok in zip(rows, is_object)]
+            columns[name] = column
+        result = self.validate_columns(columns)
+        if not all(is_object):
+            result = BatchResult(self, result.values, result.codes, result.n_rows,
+                                 not_object=~np.array(is_object, dtype=bool))
+        return result
+
+
+def check_column_lengths(columns):
+    """
+    Returns jumlah baris (0 jika tidak ada kolom).
+
+    Raises:
+        ValueError: panjang kolom tidak sama
+    """
+    lengths = {name: len(column) for name, column in columns.items()}
+    if len(set(lengths.values())) > 1:
+        detail = ', '.join(f"{name}={length}" for name, length in lengths.items())
+        raise ValueError(f"Column lengths differ: {detail}")
+    return next(iter(lengths.values()), 0)
+
+
+def error_summary(errors):
+    """Gabungkan list error menjadi satu pesan (format pesan lama API)"""
+    missing = [e['field'] for e in errors if e['code'] == 'missing_field']
+    messages = [f"Missing required fields: {', '.join(missing)}"] if missing else []
+    messages += [e['message'] for e in errors if e['code'] != 'missing_field']
+    return '; '.join(messages)
+
+
+# Validator default (di-compile sekali saat import)
+validator = Validator()